@@ -0,0 +1,54 @@
+"""Shows that `Value.backward()` runs in linear time on long chains and wide fan-in graphs.
+
+Usage: poetry run python benchmarks/bench_backward.py [--max-size 1000000]
+"""
+
+import argparse
+
+from common import best_of, print_table
+
+from mini_auto_grad.solution.engine import Value
+
+
+def build_chain(n_nodes: int) -> Value:
+    """x + x + ... + x, a graph that is `n_nodes` deep."""
+    x = Value(1.0)
+    output = x
+    for _ in range(n_nodes - 1):
+        output = output + x
+    return output
+
+
+def build_fan_in(n_nodes: int) -> Value:
+    """A single leaf used by n/3 products that are summed by a balanced tree."""
+    x = Value(1.0)
+    level = [x * 0.5 for _ in range(n_nodes // 3)]
+    while len(level) > 1:
+        level = [a + b for a, b in zip(level[::2], level[1::2])] + level[
+            len(level) // 2 * 2 :
+        ]
+    return level[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-size", type=int, default=10**6)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sizes = [10**p for p in range(3, 7) if 10**p <= args.max_size]
+    rows = []
+    for name, build in [("chain", build_chain), ("fan-in", build_fan_in)]:
+        for size in sizes:
+            root = build(size)
+            seconds = best_of(root.backward, args.repeat)
+            rows.append(
+                [name, size, f"{seconds * 1e3:.1f}", f"{seconds / size * 1e9:.0f}"]
+            )
+            del root
+
+    print_table(["graph", "size", "backward ms", "ns/node"], rows)
+
+
+if __name__ == "__main__":
+    main()
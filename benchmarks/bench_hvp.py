@@ -0,0 +1,45 @@
+"""Times Hessian-vector products against plain gradients for MLPs with thousands of parameters.
+
+Usage: poetry run python benchmarks/bench_hvp.py
+"""
+
+import random
+
+from common import best_of, print_table
+
+from mini_auto_grad.solution.functional import hessian_vector_product
+from mini_auto_grad.solution.nn import MLP
+
+N_SAMPLES = 4
+
+
+def main() -> None:
+    rows = []
+    for sizes in [[4, 16, 16, 1], [8, 32, 32, 1], [16, 64, 64, 1]]:
+        mlp = MLP(sizes)
+        parameters = mlp.parameters()
+        x = [[random.uniform(-1, 1) for _ in range(sizes[0])] for _ in range(N_SAMPLES)]
+        vector = [random.uniform(-1, 1) for _ in parameters]
+
+        def loss():
+            return sum(mlp(x_i)[0] ** 2 for x_i in x)
+
+        gradient = best_of(lambda: loss().backward())
+        product = best_of(lambda: hessian_vector_product(loss(), parameters, vector))
+        rows.append(
+            [
+                str(sizes),
+                len(parameters),
+                f"{gradient * 1e3:.1f}",
+                f"{product * 1e3:.1f}",
+                f"{product / gradient:.1f}x",
+                f"{product * len(parameters):.0f}",
+            ]
+        )
+
+    header = ["mlp", "parameters", "grad ms", "hvp ms", "hvp/grad", "full H s"]
+    print_table(header, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Measures the memory used per graph node by the forward pass of an MLP.
+
+The same unfused graph, one node per `+`, `*` and `tanh` like the original `Neuron`,
+is built with `ClosureValue`, a copy of the original node layout (a `__dict__`, a set
+of children and a backward closure per node), and with the current `Value`. This
+compares the node layouts op node for op node. The last row is the current `MLP`,
+which fuses every neuron into a single node, so its nodes are fewer but larger.
+
+Usage: poetry run python benchmarks/bench_memory.py
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import tracemalloc
+from typing import Callable, Optional, Union
+
+from common import print_table
+
+from mini_auto_grad.solution.engine import Value
+from mini_auto_grad.solution.nn import MLP
+
+SIZES = [[64, 64, 64, 1], [16, 16, 1]]
+
+
+def _noop_grad(_: float) -> None:
+    pass
+
+
+class ClosureValue:
+    """The node layout before `__slots__` and op codes, for reference."""
+
+    def __init__(
+        self,
+        data: float,
+        children: Optional[set[ClosureValue]] = None,
+        _backwards: Callable[[float], None] = _noop_grad,
+    ):
+        self.data = data
+        self.grad = 0.0
+        self.children = set() if children is None else children
+        self._backwards = _backwards
+
+    def __add__(self, other: Union[float, ClosureValue]) -> ClosureValue:
+        if isinstance(other, (float, int)):
+            other = ClosureValue(other)
+
+        def _backward(grad_parent: float) -> None:
+            self.grad += grad_parent
+            other.grad += grad_parent
+
+        return ClosureValue(self.data + other.data, {self, other}, _backward)
+
+    def __radd__(self, other: Union[float, ClosureValue]) -> ClosureValue:
+        return self + other
+
+    def __mul__(self, other: Union[float, ClosureValue]) -> ClosureValue:
+        if isinstance(other, (float, int)):
+            other = ClosureValue(other)
+
+        def _backward(grad_parent: float) -> None:
+            self.grad += other.data * grad_parent
+            other.grad += self.data * grad_parent
+
+        return ClosureValue(self.data * other.data, {self, other}, _backward)
+
+    def tanh(self) -> ClosureValue:
+        def _backward(grad_parent: float) -> None:
+            self.grad += (1 - math.tanh(self.data) ** 2) * grad_parent
+
+        return ClosureValue(math.tanh(self.data), {self}, _backward)
+
+
+def unfused_forward(layers: list, x: list) -> list:
+    for layer in layers:
+        x = [
+            (sum(w_i * x_i for w_i, x_i in zip(weights, x)) + bias).tanh()
+            for weights, bias in layer
+        ]
+    return x
+
+
+def unfused_parameters(node_type: type, sizes: list[int]) -> list:
+    return [
+        [
+            ([node_type(random.uniform(-1, 1)) for _ in range(n_in)], node_type(0))
+            for _ in range(n_out)
+        ]
+        for n_in, n_out in zip(sizes, sizes[1:])
+    ]
+
+
+def count_nodes(roots: list) -> int:
+    seen = set()
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        if node not in seen:
+            seen.add(node)
+            stack.extend(node.children)
+    return len(seen)
+
+
+def traced(forward: Callable[[], list]) -> tuple[list, int]:
+    tracemalloc.start()
+    outputs = forward()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return outputs, allocated
+
+
+def row(layout: str, sizes: list[int], outputs: list, n_parameters: int, allocated):
+    n_nodes = count_nodes(outputs) - n_parameters
+    return [
+        layout,
+        str(sizes),
+        n_nodes,
+        f"{allocated / 1024:.0f}",
+        f"{allocated / n_nodes:.0f}",
+    ]
+
+
+def measure(sizes: list[int]) -> list[list[object]]:
+    x = [random.uniform(-1, 1) for _ in range(sizes[0])]
+    n_parameters = sum((n_in + 1) * n_out for n_in, n_out in zip(sizes, sizes[1:]))
+    rows = []
+
+    for layout, node_type in [("closure (reference)", ClosureValue), ("slots", Value)]:
+        layers = unfused_parameters(node_type, sizes)
+        # The inputs are wrapped by the first multiplications, like the original Neuron.
+        outputs, allocated = traced(lambda: unfused_forward(layers, x))
+        rows.append(row(layout, sizes, outputs, n_parameters, allocated))
+
+    mlp = MLP(sizes)
+    outputs, allocated = traced(lambda: mlp(x))
+    rows.append(row("slots, fused MLP", sizes, outputs, n_parameters, allocated))
+    return rows
+
+
+def main() -> None:
+    rows = [r for sizes in SIZES for r in measure(sizes)]
+    print_table(["layout", "mlp", "new nodes", "KiB", "bytes/node"], rows)
+
+
+if __name__ == "__main__":
+    main()
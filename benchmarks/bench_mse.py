@@ -0,0 +1,103 @@
+"""Compares an MSE loss built with the native sub, neg and div nodes against the same
+expression built with the previous operators, which composed them from add, mul and
+pow nodes.
+
+Usage: poetry run python benchmarks/bench_mse.py
+"""
+
+import contextlib
+import random
+from typing import Iterator
+
+from common import best_of, print_table
+
+from mini_auto_grad.solution.engine import Value, find_reversed_topological_order
+
+
+def _neg(self):
+    return self * -1
+
+
+def _sub(self, other):
+    return self + (-other)
+
+
+def _rsub(self, other):
+    return other + (-self)
+
+
+def _truediv(self, other):
+    return self * other**-1
+
+
+def _rtruediv(self, other):
+    return other * self**-1
+
+
+@contextlib.contextmanager
+def composed_operators() -> Iterator[None]:
+    """Temporarily restores the operators as they were before the native nodes."""
+    names = ["__neg__", "__sub__", "__rsub__", "__truediv__", "__rtruediv__"]
+    native = {name: vars(Value)[name] for name in names}
+    for name, operator in zip(names, [_neg, _sub, _rsub, _truediv, _rtruediv]):
+        setattr(Value, name, operator)
+    try:
+        yield
+    finally:
+        for name, operator in native.items():
+            setattr(Value, name, operator)
+
+
+def mse(y_pred: list[Value], y: list) -> Value:
+    return sum((p - y_i) ** 2 for p, y_i in zip(y_pred, y)) / len(y)
+
+
+def step(y_pred: list[Value], y: list) -> None:
+    mse(y_pred, y).backward()
+
+
+def measure(y_pred: list[Value], y: list) -> tuple[int, float]:
+    nodes = len(find_reversed_topological_order(mse(y_pred, y)))
+    return nodes, best_of(lambda: step(y_pred, y), repeat=7)
+
+
+def main() -> None:
+    rows = []
+    for n in [100, 1_000, 10_000]:
+        y_pred = [Value(random.uniform(-1, 1)) for _ in range(n)]
+        floats = [random.uniform(-1, 1) for _ in range(n)]
+        # Values, e.g. targets that are themselves the output of a model.
+        values = [Value(y_i) for y_i in floats]
+
+        for targets, y in [("float", floats), ("Value", values)]:
+            with composed_operators():
+                composed_nodes, composed = measure(y_pred, y)
+            native_nodes, native = measure(y_pred, y)
+            rows.append(
+                [
+                    n,
+                    targets,
+                    composed_nodes,
+                    native_nodes,
+                    f"{composed * 1e3:.2f}",
+                    f"{native * 1e3:.2f}",
+                    f"{composed / native:.2f}x",
+                ]
+            )
+
+    print_table(
+        [
+            "n",
+            "targets",
+            "composed nodes",
+            "native nodes",
+            "composed ms",
+            "native ms",
+            "speedup",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Measures how data-parallel training steps scale with the number of worker processes.
+
+Usage: poetry run python benchmarks/bench_parallel.py
+"""
+
+import os
+import random
+
+import numpy as np
+from common import best_of, print_table
+
+from mini_auto_grad.solution.nn import MLP
+from mini_auto_grad.solution.optim import SGD
+from mini_auto_grad.solution.parallel import DataParallelTrainer
+
+SIZES = [32, 64, 64, 1]
+N_SAMPLES = 4096
+N_STEPS = 10
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    x = rng.uniform(-1, 1, size=(N_SAMPLES, SIZES[0]))
+    y = rng.uniform(-1, 1, size=N_SAMPLES)
+
+    rows = []
+    baseline = None
+    for n_workers in range(1, (os.cpu_count() or 1) + 1):
+        random.seed(0)
+        mlp = MLP(SIZES)
+        optimizer = SGD(mlp.flatten_parameters(), lr=0.01)
+        with DataParallelTrainer(mlp, optimizer, x, y, n_workers) as trainer:
+            seconds = best_of(lambda: [trainer.step() for _ in range(N_STEPS)])
+
+        baseline = baseline or seconds
+        rows.append(
+            [
+                str(n_workers),
+                f"{N_STEPS / seconds:.1f}",
+                f"{baseline / seconds:.2f}x",
+            ]
+        )
+
+    print_table(["workers", "steps/s", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Latency per sample of graph building forward passes versus `Module.predict`.
+
+Usage: poetry run python benchmarks/bench_predict.py
+"""
+
+import numpy as np
+from common import best_of, print_table
+
+from mini_auto_grad.solution.engine import no_grad
+from mini_auto_grad.solution.nn import MLP
+
+BATCH_SIZE = 256
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    rows = []
+    for sizes in [[2, 8, 8, 1], [64, 256, 256, 1]]:
+        mlp = MLP(sizes)
+        # predict evaluates arrays straight from the flat storage.
+        mlp.flatten_parameters()
+        x = rng.uniform(-1, 1, size=(BATCH_SIZE, sizes[0]))
+        sample, sample_list = x[0], x[0].tolist()
+
+        def eager_no_grad():
+            with no_grad():
+                mlp(sample_list)
+
+        timings = {
+            "graph": best_of(lambda: mlp(sample_list)),
+            "no_grad graph": best_of(eager_no_grad),
+            "predict(list)": best_of(lambda: mlp.predict(sample_list)),
+            "predict(array)": best_of(lambda: mlp.predict(sample)),
+            "predict(batch)": best_of(lambda: mlp.predict(x)) / BATCH_SIZE,
+        }
+        for name, seconds in timings.items():
+            rows.append([str(sizes), name, f"{seconds * 1e6:.1f}"])
+
+    print_table(["mlp", "mode", "us/sample"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compares training steps per second of eager graphs with a replayed `Tape`.
+
+Usage: poetry run python benchmarks/bench_tape.py
+"""
+
+import random
+
+from common import best_of, print_table
+
+from mini_auto_grad.solution.nn import MLP
+from mini_auto_grad.solution.tape import trace
+
+N_STEPS = 50
+LEARNING_RATE = 0.01
+
+
+def loss(mlp: MLP, x: list) -> object:
+    *features, target = x
+    return (mlp(features)[0] - target) ** 2
+
+
+def eager_steps(mlp: MLP, samples: list[list[float]]) -> None:
+    for x in samples:
+        mlp.zero_grad()
+        loss(mlp, x).backward()
+        for p in mlp.parameters():
+            p.data -= LEARNING_RATE * p.grad
+
+
+def tape_steps(mlp: MLP, samples: list[list[float]]) -> None:
+    tape = trace(lambda x: loss(mlp, x), samples[0])
+    for x in samples:
+        mlp.zero_grad()
+        tape(x)
+        tape.backward()
+        for p in mlp.parameters():
+            p.data -= LEARNING_RATE * p.grad
+
+
+def main() -> None:
+    rows = []
+    for sizes in [[2, 8, 8, 1], [8, 32, 32, 1], [32, 64, 64, 1]]:
+        mlp = MLP(sizes)
+        samples = [
+            [random.uniform(-1, 1) for _ in range(sizes[0] + 1)] for _ in range(N_STEPS)
+        ]
+        eager = best_of(lambda: eager_steps(mlp, samples))
+        replay = best_of(lambda: tape_steps(mlp, samples))
+        rows.append(
+            [
+                str(sizes),
+                f"{N_STEPS / eager:.0f}",
+                f"{N_STEPS / replay:.0f}",
+                f"{eager / replay:.1f}x",
+            ]
+        )
+
+    print_table(["mlp", "eager steps/s", "tape steps/s", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compares a tanh layer built from scalar `Value`s with the same layer as one `Tensor` node.
+
+Usage: poetry run python benchmarks/bench_tensor.py
+"""
+
+import numpy as np
+from common import best_of, print_table
+
+from mini_auto_grad.solution.engine import Tensor
+from mini_auto_grad.solution.nn import Layer
+
+
+def scalar_step(layer: Layer, x: np.ndarray) -> None:
+    loss = sum(sum(layer(list(x_i))) for x_i in x)
+    loss.backward()
+
+
+def tensor_step(weights: Tensor, bias: Tensor, x: np.ndarray) -> None:
+    loss = (Tensor(x) @ weights + bias).tanh().sum()
+    loss.backward()
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    rows = []
+    for width in [16, 64, 128]:
+        for batch_size in [1, 8]:
+            x = rng.uniform(-1, 1, size=(batch_size, width))
+            layer = Layer(width, width, non_linear=True)
+            weights = Tensor(rng.uniform(-1, 1, size=(width, width)))
+            bias = Tensor(np.zeros(width))
+
+            scalar = best_of(lambda: scalar_step(layer, x))
+            tensor = best_of(lambda: tensor_step(weights, bias, x))
+            rows.append(
+                [
+                    width,
+                    batch_size,
+                    f"{scalar * 1e3:.2f}",
+                    f"{tensor * 1e3:.3f}",
+                    f"{scalar / tensor:.0f}x",
+                ]
+            )
+
+    print_table(["width", "batch", "scalar ms", "tensor ms", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import time
+import tracemalloc
+from typing import Callable
+
+
+def best_of(function: Callable[[], object], repeat: int = 3) -> float:
+    """Returns the fastest wall clock time in seconds of `repeat` calls to `function`."""
+    return min(timings(function, repeat))
+
+
+def timings(function: Callable[[], object], repeat: int) -> list[float]:
+    """Returns the wall clock time in seconds of `repeat` calls to `function`."""
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        result.append(time.perf_counter() - start)
+
+    return result
+
+
+def peak_memory(function: Callable[[], object]) -> int:
+    """Returns the peak number of bytes traced by tracemalloc during one call."""
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def print_table(header: list[str], rows: list[list[object]]) -> None:
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in [header, *rows]:
+        print("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
@@ -0,0 +1,210 @@
+"""Reproducible benchmarks of the engine and nn hot paths with machine readable output.
+
+Every case is timed `--repeat` times (best and median are reported) and run once more
+under tracemalloc to record its peak memory. Results are written as JSON, so runs on
+different commits can be compared:
+
+    poetry run python benchmarks/suite.py --output before.json
+    git checkout other-branch
+    poetry run python benchmarks/suite.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+from typing import Callable, Optional
+
+from common import peak_memory, print_table, timings
+
+from mini_auto_grad.solution.engine import Value, find_reversed_topological_order
+from mini_auto_grad.solution.nn import MLP, Layer, Neuron
+from mini_auto_grad.solution.optim import Adam
+
+Case = Callable[[int], Callable[[], object]]
+
+GRAPH_SIZES = [10**3, 10**4, 10**5]
+WIDTHS = [8, 32, 128]
+BATCH_SIZE = 8
+
+
+def build_graph(n_nodes: int) -> Value:
+    """A chain of alternating multiplications and tanh with shared leaves."""
+    x = Value(0.5)
+    w = Value(0.9)
+    output = x
+    for i in range(n_nodes // 2):
+        output = (output * w).tanh() if i % 2 else output * w + x
+    return output
+
+
+def graph_construction(n_nodes: int) -> Callable[[], object]:
+    return lambda: build_graph(n_nodes)
+
+
+def topological_order(n_nodes: int) -> Callable[[], object]:
+    root = build_graph(n_nodes)
+    return lambda: find_reversed_topological_order(root)
+
+
+def backward(n_nodes: int) -> Callable[[], object]:
+    root = build_graph(n_nodes)
+    return root.backward
+
+
+def _random_sample(n_features: int) -> list[float]:
+    return [random.uniform(-1, 1) for _ in range(n_features)]
+
+
+def neuron_forward(width: int) -> Callable[[], object]:
+    neuron = Neuron(width)
+    x = _random_sample(width)
+    return lambda: neuron(x)
+
+
+def layer_forward(width: int) -> Callable[[], object]:
+    layer = Layer(width, width, non_linear=True)
+    x = _random_sample(width)
+    return lambda: layer(x)
+
+
+def mlp_forward(width: int) -> Callable[[], object]:
+    mlp = MLP([width, width, width, 1])
+    x = _random_sample(width)
+    return lambda: mlp(x)
+
+
+def training_step(width: int) -> Callable[[], object]:
+    """Forward over a minibatch, mean squared error, backward and an SGD update."""
+    mlp = MLP([width, width, width, 1])
+    x = [_random_sample(width) for _ in range(BATCH_SIZE)]
+    y = _random_sample(BATCH_SIZE)
+
+    def step() -> None:
+        y_pred = [mlp(x_i)[0] for x_i in x]
+        loss = sum((y_i - y_pred_i) ** 2 for y_i, y_pred_i in zip(y, y_pred)) / len(y)
+        mlp.zero_grad()
+        loss.backward()
+        for p in mlp.parameters():
+            p.data += -0.01 * p.grad
+
+    return step
+
+
+def optimizer_step(width: int) -> Callable[[], object]:
+    mlp = MLP([width, width, width, 1])
+    return Adam(mlp.parameters()).step
+
+
+def flat_optimizer_step(width: int) -> Callable[[], object]:
+    mlp = MLP([width, width, width, 1])
+    return Adam(mlp.flatten_parameters()).step
+
+
+CASES: dict[str, tuple[Case, list[int]]] = {
+    "graph_construction": (graph_construction, GRAPH_SIZES),
+    "topological_order": (topological_order, GRAPH_SIZES),
+    "backward": (backward, GRAPH_SIZES),
+    "neuron_forward": (neuron_forward, WIDTHS),
+    "layer_forward": (layer_forward, WIDTHS),
+    "mlp_forward": (mlp_forward, WIDTHS),
+    "training_step": (training_step, WIDTHS),
+    "optimizer_step": (optimizer_step, WIDTHS),
+    "flat_optimizer_step": (flat_optimizer_step, WIDTHS),
+}
+
+
+def run(names: list[str], repeat: int, max_size: Optional[int]) -> list[dict]:
+    results = []
+    for name in names:
+        case, sizes = CASES[name]
+        for size in sizes:
+            if max_size is not None and size > max_size:
+                continue
+            random.seed(0)
+            function = case(size)
+            seconds = sorted(timings(function, repeat))
+            results.append(
+                {
+                    "name": name,
+                    "size": size,
+                    "best_s": seconds[0],
+                    "median_s": seconds[len(seconds) // 2],
+                    "peak_bytes": peak_memory(function),
+                }
+            )
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _report(results: list[dict], baseline: Optional[dict]) -> None:
+    previous = {}
+    if baseline is not None:
+        previous = {(r["name"], r["size"]): r for r in baseline["results"]}
+
+    rows = []
+    for r in results:
+        row = [
+            r["name"],
+            r["size"],
+            f"{r['best_s'] * 1e3:.3f}",
+            f"{r['median_s'] * 1e3:.3f}",
+            f"{r['peak_bytes'] / 1024:.0f}",
+        ]
+        if baseline is not None:
+            old = previous.get((r["name"], r["size"]))
+            row.append("-" if old is None else f"{r['best_s'] / old['best_s']:.2f}x")
+        rows.append(row)
+
+    header = ["case", "size", "best ms", "median ms", "peak KiB"]
+    if baseline is not None:
+        header.append(f"vs {baseline.get('commit') or 'baseline'}")
+    print_table(header, rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", help=f"any of {', '.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-size", type=int, default=None)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare to")
+    args = parser.parse_args()
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = run(args.cases or list(CASES), args.repeat, args.max_size)
+    _report(results, baseline)
+
+    if args.output is not None:
+        report = {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
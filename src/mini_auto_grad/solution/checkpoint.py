@@ -0,0 +1,88 @@
+import json
+import os
+from typing import Optional, Union
+
+import numpy as np
+
+from mini_auto_grad.solution.nn import FlatParameters, MLP, n_parameters
+
+Path = Union[str, os.PathLike]
+
+MAGIC = b"MAGCKPT\x01"
+# The parameters start at a multiple of this offset, so they can be mapped aligned.
+ALIGNMENT = 64
+
+
+def save_checkpoint(mlp: MLP, path: Path) -> None:
+    """Writes the sizes and activations of `mlp` and the data of its parameters to `path`.
+
+    The file holds `MAGIC`, the byte length of a JSON header as a little-endian uint32,
+    the header padded to `ALIGNMENT` and the parameters, in the order of
+    `mlp.parameters()`, as one block of little-endian float64.
+    """
+    if mlp.flat is not None:
+        data = mlp.flat.data
+    else:
+        data = np.array([p.data for p in mlp.parameters()])
+
+    header = json.dumps(
+        {
+            "sizes": mlp.sizes,
+            "activation": mlp.activation,
+            "output_activation": mlp.output_activation,
+            "n_parameters": len(data),
+        }
+    ).encode()
+    offset = _data_offset(len(header))
+    padding = b" " * (offset - len(MAGIC) - 4 - len(header))
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(4, "little"))
+        f.write(header + padding)
+        f.write(np.ascontiguousarray(data, dtype="<f8").tobytes())
+
+
+def load_checkpoint(
+    path: Path, sizes: Optional[list[int]] = None, mmap_mode: str = "c"
+) -> MLP:
+    """Creates the MLP stored at `path` with flat parameters that are mapped from the file.
+
+    Nothing is parsed or copied up front: the parameters are paged in when used. Use
+    `mmap_mode="r"` to serve with `predict`. With the default "c" updates stay in
+    memory, with "r+" they are written back to the file. Pass `sizes` to check that
+    the checkpoint has the expected shape.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a checkpoint")
+        header_length = int.from_bytes(f.read(4), "little")
+        header = json.loads(f.read(header_length))
+
+    stored_sizes = header["sizes"]
+    if sizes is not None and list(sizes) != stored_sizes:
+        raise ValueError(f"Expected an MLP of sizes {sizes}, found {stored_sizes}")
+
+    n_expected = n_parameters(stored_sizes)
+    offset = _data_offset(header_length)
+    n_stored = (os.path.getsize(path) - offset) // 8
+    if header["n_parameters"] != n_expected or n_stored != n_expected:
+        raise ValueError(
+            f"Expected {n_expected} parameters for layers of sizes {stored_sizes}, "
+            f"found {n_stored}"
+        )
+
+    data = np.memmap(path, "<f8", mmap_mode, offset, (n_expected,))
+    flat = FlatParameters(data, np.zeros(n_expected))
+    return MLP(
+        stored_sizes,
+        header["activation"],
+        # Missing from checkpoints written before MLP had an output activation.
+        header.get("output_activation"),
+        flat=flat,
+    )
+
+
+def _data_offset(header_length: int) -> int:
+    end_of_header = len(MAGIC) + 4 + header_length
+    return -(-end_of_header // ALIGNMENT) * ALIGNMENT
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import math
+from typing import Callable, Union
+
+import numpy as np
+
+from mini_auto_grad.solution.engine import (
+    LOCAL_GRADIENT_RULES,
+    Value,
+    _sigmoid,
+    find_reversed_topological_order,
+)
+
+Tangent = Union[float, np.ndarray]
+DualRule = Callable[[Value, list["Dual"]], "Dual"]
+
+
+class Dual:
+    """A dual number `data + tangent * eps` with `eps ** 2 = 0`, for forward mode autodiff.
+
+    Evaluating a function on Duals computes its value and, in the same pass, its
+    directional derivative along the tangents of the inputs. The tangent can also be
+    a NumPy vector, which pushes several directions through the function at once.
+    """
+
+    __slots__ = ("data", "tangent")
+
+    def __init__(self, data: float, tangent: Tangent = 0.0):
+        self.data = data
+        self.tangent = tangent
+
+    def __add__(self, other: Union[float, Dual]) -> Dual:
+        """self + other"""
+        other = _as_dual(other)
+        return Dual(self.data + other.data, self.tangent + other.tangent)
+
+    def __mul__(self, other: Union[float, Dual]) -> Dual:
+        """self * other"""
+        other = _as_dual(other)
+        return Dual(
+            self.data * other.data,
+            self.tangent * other.data + self.data * other.tangent,
+        )
+
+    def tanh(self) -> Dual:
+        output = math.tanh(self.data)
+        return Dual(output, (1 - output**2) * self.tangent)
+
+    def __pow__(self, power: float) -> Dual:
+        """self ** power"""
+        assert isinstance(power, (int, float)), "Only support int/float powers"
+        return Dual(self.data**power, (power * self.data ** (power - 1)) * self.tangent)
+
+    def exp(self) -> Dual:
+        output = math.exp(self.data)
+        return Dual(output, output * self.tangent)
+
+    def log(self) -> Dual:
+        return Dual(math.log(self.data), self.tangent / self.data)
+
+    def relu(self) -> Dual:
+        if self.data > 0:
+            return Dual(self.data, self.tangent)
+        return Dual(0.0, 0.0 * self.tangent)
+
+    def sigmoid(self) -> Dual:
+        output = _sigmoid(self.data)
+        return Dual(output, output * (1 - output) * self.tangent)
+
+    def __abs__(self) -> Dual:
+        """abs(self)"""
+        sign = math.copysign(1.0, self.data) if self.data else 0.0
+        return Dual(abs(self.data), sign * self.tangent)
+
+    def __neg__(self) -> Dual:
+        """-self"""
+        return Dual(-self.data, -self.tangent)
+
+    def __radd__(self, other: Union[float, Dual]) -> Dual:
+        """other + self"""
+        return self + other
+
+    def __sub__(self, other: Union[float, Dual]) -> Dual:
+        """self - other"""
+        return self + (-_as_dual(other))
+
+    def __rsub__(self, other: Union[float, Dual]) -> Dual:
+        """other - self"""
+        return other + (-self)
+
+    def __rmul__(self, other: Union[float, Dual]) -> Dual:
+        """other * self"""
+        return self * other
+
+    def __truediv__(self, other: Union[float, Dual]) -> Dual:
+        """self / other"""
+        other = _as_dual(other)
+        return Dual(
+            self.data / other.data,
+            (self.tangent * other.data - self.data * other.tangent) / other.data**2,
+        )
+
+    def __rtruediv__(self, other: Union[float, Dual]) -> Dual:
+        """other / self"""
+        return _as_dual(other) / self
+
+    def __repr__(self) -> str:
+        return f"Dual(data={self.data}, tangent={self.tangent})"
+
+
+def _as_dual(value: Union[float, Dual]) -> Dual:
+    if isinstance(value, Dual):
+        return value
+    return Dual(value)
+
+
+def _add_dual(node: Value, children: list[Dual]) -> Dual:
+    left, right = children
+    return left + right
+
+
+def _mul_dual(node: Value, children: list[Dual]) -> Dual:
+    left, right = children
+    return left * right
+
+
+def _neg_dual(node: Value, children: list[Dual]) -> Dual:
+    (child,) = children
+    return -child
+
+
+def _sub_dual(node: Value, children: list[Dual]) -> Dual:
+    left, right = children
+    return left - right
+
+
+def _div_dual(node: Value, children: list[Dual]) -> Dual:
+    numerator, denominator = children
+    return numerator / denominator
+
+
+def _rdiv_dual(node: Value, children: list[Dual]) -> Dual:
+    (denominator,) = children
+    return node.arg / denominator
+
+
+def _tanh_dual(node: Value, children: list[Dual]) -> Dual:
+    (child,) = children
+    return child.tanh()
+
+
+def _pow_dual(node: Value, children: list[Dual]) -> Dual:
+    (base,) = children
+    return base**node.arg
+
+
+def _linear_dual(node: Value, children: list[Dual]) -> Dual:
+    n = node.arg
+    activation = Dual(0.0)
+    for i in range(n):
+        activation = activation + children[i] * children[n + i]
+    if len(children) > 2 * n:
+        activation = activation + children[2 * n]
+    return activation
+
+
+def _affine_tanh_dual(node: Value, children: list[Dual]) -> Dual:
+    return _linear_dual(node, children).tanh()
+
+
+def _affine_relu_dual(node: Value, children: list[Dual]) -> Dual:
+    return _linear_dual(node, children).relu()
+
+
+def _affine_sigmoid_dual(node: Value, children: list[Dual]) -> Dual:
+    return _linear_dual(node, children).sigmoid()
+
+
+def _exp_dual(node: Value, children: list[Dual]) -> Dual:
+    (child,) = children
+    return child.exp()
+
+
+def _log_dual(node: Value, children: list[Dual]) -> Dual:
+    (child,) = children
+    return child.log()
+
+
+def _relu_dual(node: Value, children: list[Dual]) -> Dual:
+    (child,) = children
+    return child.relu()
+
+
+def _sigmoid_dual(node: Value, children: list[Dual]) -> Dual:
+    (child,) = children
+    return child.sigmoid()
+
+
+def _abs_dual(node: Value, children: list[Dual]) -> Dual:
+    (child,) = children
+    return abs(child)
+
+
+def _local_gradients_dual(node: Value, children: list[Dual]) -> Dual:
+    # The chain rule over the recorded partial derivatives, for nodes with many children.
+    local_gradients = LOCAL_GRADIENT_RULES[node.op](node)
+    tangent = sum(g * child.tangent for g, child in zip(local_gradients, children))
+    return Dual(node.data, tangent)
+
+
+# Evaluates the operation of a recorded node on the Duals of its children.
+DUAL_RULES: dict[str, DualRule] = {
+    "add": _add_dual,
+    "mul": _mul_dual,
+    "neg": _neg_dual,
+    "sub": _sub_dual,
+    "div": _div_dual,
+    "rdiv": _rdiv_dual,
+    "tanh": _tanh_dual,
+    "pow": _pow_dual,
+    "linear": _linear_dual,
+    "affine_tanh": _affine_tanh_dual,
+    "affine_relu": _affine_relu_dual,
+    "affine_sigmoid": _affine_sigmoid_dual,
+    "exp": _exp_dual,
+    "log": _log_dual,
+    "relu": _relu_dual,
+    "sigmoid": _sigmoid_dual,
+    "abs": _abs_dual,
+    "log_softmax": _local_gradients_dual,
+    "cross_entropy": _local_gradients_dual,
+}
+
+
+def push_forward(
+    outputs: list[Value], inputs: list[Value], tangents: list[Tangent]
+) -> list[Dual]:
+    """Propagates the `tangents` of `inputs` through the recorded graph of `outputs`.
+
+    This is forward mode over an existing graph: one pass from the inputs to the
+    outputs, however many outputs there are. Other leaves get a zero tangent.
+    """
+    duals = {x: Dual(x.data, tangent) for x, tangent in zip(inputs, tangents)}
+    dual_rules = DUAL_RULES
+    for node in reversed(find_reversed_topological_order(*outputs)):
+        if node in duals:
+            continue
+        if not node.children:
+            duals[node] = Dual(node.data)
+            continue
+        duals[node] = dual_rules[node.op](node, [duals[c] for c in node.children])
+
+    return [duals[output] for output in outputs]
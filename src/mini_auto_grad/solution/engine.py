@@ -1,26 +1,63 @@
 from __future__ import annotations
 
+import contextlib
 import math
-from typing import Callable, Optional, Union
+from typing import Callable, Iterator, Optional, Union
 
-Backwards = Callable[[float], None]
+import numpy as np
 
+BackwardRule = Callable[["Value", float], None]
+ForwardRule = Callable[["Value"], None]
+GraphGradients = tuple["Value", tuple[Union["Value", float], ...]]
+GraphBackwardRule = Callable[["Value", "Value"], GraphGradients]
+LocalGradientRule = Callable[["Value"], tuple[float, ...]]
 
-def _noop_grad(_: float) -> None:
-    pass
+_grad_enabled = True
+
+
+@contextlib.contextmanager
+def no_grad() -> Iterator[None]:
+    """Within this context new nodes do not record their children, like `torch.no_grad`.
+
+    Use it for inference-only forward passes: no graph is kept alive, only the data.
+    """
+    global _grad_enabled
+    previous = _grad_enabled
+    _grad_enabled = False
+    try:
+        yield
+    finally:
+        _grad_enabled = previous
 
 
 class Value:
+    """A scalar node of the computational graph.
+
+    Nodes do not carry a closure to propagate their gradient. Instead they store the
+    name of the operation that created them in `op` and, when the operation needs it,
+    a saved constant in `arg`. The gradient rule is looked up in `BACKWARD_RULES`.
+    """
+
+    __slots__ = ("data", "grad", "children", "op", "arg", "_order")
+
     def __init__(
         self,
         data: float,
-        children: Optional[set[Value]] = None,
-        _backwards: Backwards = _noop_grad,
+        children: tuple[Value, ...] = (),
+        op: str = "leaf",
+        arg: Optional[float] = None,
     ):
         self.data = data
         self.grad = 0.0
-        self.children = set() if children is None else children
-        self._backwards = _backwards
+        if _grad_enabled:
+            self.children = children
+            self.op = op
+            self.arg = arg
+        else:
+            self.children = ()
+            self.op = "leaf"
+            self.arg = None
+        self._order = None
 
     def __add__(self, other: Union[float, Value]) -> Value:
         """self + other"""
@@ -28,63 +65,71 @@ class Value:
         if isinstance(other, (float, int)):
             other = Value(other)
 
-        def _backward(grad_parent: float) -> None:
-            self.grad += grad_parent
-            other.grad += grad_parent
-
-        return Value(
-            self.data + other.data,
-            children={self, other},
-            _backwards=_backward,
-        )
+        return Value(self.data + other.data, (self, other), "add")
 
     def __mul__(self, other: Union[float, Value]) -> Value:
         if isinstance(other, (float, int)):
             other = Value(other)
 
-        def _backward(grad_parent: float) -> None:
-            self.grad += other.data * grad_parent
-            other.grad += self.data * grad_parent
-
-        return Value(
-            self.data * other.data,
-            children={self, other},
-            _backwards=_backward,
-        )
+        return Value(self.data * other.data, (self, other), "mul")
 
     def tanh(self) -> Value:
-        def _backwards(grad_parent: float) -> None:
-            local_gradient = 1 - math.tanh(self.data) ** 2
-            self.grad += local_gradient * grad_parent
-
-        return Value(
-            math.tanh(self.data),
-            children={self},
-            _backwards=_backwards,
-        )
+        return Value(math.tanh(self.data), (self,), "tanh")
 
     def __pow__(self, power: float) -> Value:
         """self ** power"""
         assert isinstance(power, (int, float)), "Only support int/float powers"
 
-        def _backward(grad_parent: float) -> None:
-            self.grad += (power * self.data ** (power - 1)) * grad_parent
+        return Value(self.data**power, (self,), "pow", power)
 
-        return Value(
-            self.data**power,
-            children={self},
-            _backwards=_backward,
-        )
+    def exp(self) -> Value:
+        return Value(math.exp(self.data), (self,), "exp")
 
-    def backward(self) -> None:
-        self.grad = 1
+    def log(self) -> Value:
+        return Value(math.log(self.data), (self,), "log")
 
-        for v in find_reversed_topological_order(self):
-            v._backwards(v.grad)
+    def relu(self) -> Value:
+        return Value(max(self.data, 0.0), (self,), "relu")
+
+    def sigmoid(self) -> Value:
+        return Value(_sigmoid(self.data), (self,), "sigmoid")
+
+    def __abs__(self) -> Value:
+        """abs(self)"""
+        return Value(abs(self.data), (self,), "abs")
+
+    def _backwards(self, grad_parent: float) -> None:
+        BACKWARD_RULES[self.op](self, grad_parent)
+
+    def backward(self, cache_order: bool = False, retain_graph: bool = True) -> None:
+        """Computes the gradient of self with respect to every node in its graph.
+
+        With `cache_order=True` the topological order is stored on self and reused by
+        later calls, so repeated backward passes skip the graph traversal. Call
+        `invalidate_order()` if the graph below self is modified afterwards.
+
+        With `retain_graph=False` every node drops its children as soon as its gradient
+        has been propagated, so the graph can be freed during the pass. Every node
+        becomes a leaf, so a second backward through the same graph is not possible.
+        """
+        if not cache_order:
+            order = find_reversed_topological_order(self)
+        elif self._order is None:
+            order = self._order = find_reversed_topological_order(self)
+        else:
+            order = self._order
+
+        if not retain_graph:
+            self._order = None
+        _propagate(order, [self], [1], retain_graph)
+
+    def invalidate_order(self) -> None:
+        """Drops the topological order cached by `backward(cache_order=True)`."""
+        self._order = None
 
     def __neg__(self) -> Value:
         """-self"""
-        return self * -1
+        return Value(-self.data, (self,), "neg")
 
     def __radd__(self, other: Union[Value, float]) -> Value:
         """other + self
@@ -94,14 +139,16 @@ class Value:
 
     def __sub__(self, other: Union[Value, float]) -> Value:
         """self - other"""
+        if isinstance(other, (float, int)):
+            other = Value(other)
 
-        return self + (-other)
+        return Value(self.data - other.data, (self, other), "sub")
 
     def __rsub__(self, other: Union[float, Value]) -> Value:
         """other - self
         Python fallback when other is not a Value.
         """
-        return other + (-self)
+        return Value(other) - self
 
     def __rmul__(self, other: Union[float, Value]) -> Value:
         """other * self
@@ -109,33 +156,1023 @@ class Value:
         """
         return self * other
 
-    def __truediv__(self, other: Union[float, Value]):
+    def __truediv__(self, other: Union[float, Value]) -> Value:
         """self / other"""
-        return self * other**-1
+        if isinstance(other, (float, int)):
+            other = Value(other)
 
-    def __rtruediv__(self, other: Union[float, Value]):
+        return Value(self.data / other.data, (self, other), "div")
+
+    def __rtruediv__(self, other: float) -> Value:
         """other / self
-        Python fallback when other is not a Value.
+        Python fallback when other is not a Value. The constant is kept in `arg`
+        instead of a node of its own.
         """
-        return other * self**-1
+        return Value(other / self.data, (self,), "rdiv", other)
 
     def __repr__(self) -> str:
         return f"Value(data={self.data})"
 
 
-def find_reversed_topological_order(root: Value):
-    visited = set()
-    topological_order = []
+class ValueView(Value):
+    """A leaf Value whose `data` and `grad` are element `index` of two NumPy arrays.
+
+    Many views share the same arrays, so operations on all of their data or gradients,
+    like zeroing or copying them, become single array operations. Creating a view
+    never writes to the arrays, so they can be read-only, e.g. a memory-mapped file.
+
+    The `data` and `grad` slots inherited from `Value` are shadowed by the properties
+    and stay unused.
+    """
+
+    __slots__ = ("_data_storage", "_grad_storage", "_index")
+
+    def __init__(self, data_storage: np.ndarray, grad_storage: np.ndarray, index: int):
+        # Value.__init__ would assign data and grad, i.e. write to the storage.
+        self._data_storage = data_storage
+        self._grad_storage = grad_storage
+        self._index = index
+        self.children = ()
+        self.op = "leaf"
+        self.arg = None
+        self._order = None
+
+    @property
+    def data(self) -> float:
+        return self._data_storage.item(self._index)
+
+    @data.setter
+    def data(self, data: float) -> None:
+        self._data_storage[self._index] = data
+
+    @property
+    def grad(self) -> float:
+        return self._grad_storage.item(self._index)
+
+    @grad.setter
+    def grad(self, grad: float) -> None:
+        self._grad_storage[self._index] = grad
+
+
+def linear_combination(
+    weights: list[Value],
+    inputs: list[Union[Value, float]],
+    bias: Optional[Value] = None,
+) -> Value:
+    r"""bias + \sum_{i=0}^N weights_i * inputs_i as a single node.
+
+    The children are the weights, followed by the inputs and the bias. Floats in
+    `inputs` are wrapped in a Value, so pass Values to share them between nodes.
+    """
+    return _affine(weights, inputs, bias, "linear")
+
+
+def affine_tanh(
+    weights: list[Value], inputs: list[Union[Value, float]], bias: Value
+) -> Value:
+    r"""tanh(bias + \sum_{i=0}^N weights_i * inputs_i) as a single node."""
+    return _affine(weights, inputs, bias, "affine_tanh")
+
+
+def affine_activation(
+    weights: list[Value],
+    inputs: list[Union[Value, float]],
+    bias: Value,
+    activation: str,
+) -> Value:
+    r"""activation(bias + \sum_{i=0}^N weights_i * inputs_i) as a single node.
+
+    `activation` is one of `ACTIVATIONS`: "tanh", "relu", "sigmoid" or "identity".
+    """
+    return _affine(weights, inputs, bias, AFFINE_OPS[activation])
+
+
+def log_softmax(logits: list[Value]) -> list[Value]:
+    """log(softmax(logits)) with one node per output.
+
+    Node i stores `logits_i - logsumexp(logits)` with the logits as children and i in
+    `arg`. The log-sum-exp is shifted by the largest logit, so large logits are fine.
+    """
+    logits = tuple(logits)
+    log_normalizer = _log_sum_exp(logits)
+    return [
+        Value(x.data - log_normalizer, logits, "log_softmax", i)
+        for i, x in enumerate(logits)
+    ]
+
+
+def softmax(logits: list[Value]) -> list[Value]:
+    return [p.exp() for p in log_softmax(logits)]
+
+
+def cross_entropy(logits: list[Value], target: int) -> Value:
+    """-log(softmax(logits)[target]) as a single node, with `target` in `arg`."""
+    logits = tuple(logits)
+    assert 0 <= target < len(logits), "Expected the index of one of the logits"
+    return Value(
+        _log_sum_exp(logits) - logits[target].data, logits, "cross_entropy", target
+    )
+
+
+def _sigmoid(x: float) -> float:
+    # Only exponentiate negative numbers, so large |x| can't overflow.
+    if x >= 0:
+        return 1 / (1 + math.exp(-x))
+    z = math.exp(x)
+    return z / (1 + z)
+
+
+def _identity(x: float) -> float:
+    return x
+
+
+ACTIVATIONS: dict[str, Callable[[float], float]] = {
+    "identity": _identity,
+    "tanh": math.tanh,
+    "relu": lambda x: max(x, 0.0),
+    "sigmoid": _sigmoid,
+}
+
+# The op of the fused affine node of each activation.
+AFFINE_OPS: dict[str, str] = {
+    "identity": "linear",
+    "tanh": "affine_tanh",
+    "relu": "affine_relu",
+    "sigmoid": "affine_sigmoid",
+}
+_AFFINE_ACTIVATIONS = {op: ACTIVATIONS[name] for name, op in AFFINE_OPS.items()}
+
+
+def _log_sum_exp(children: tuple[Value, ...]) -> float:
+    shift = max(x.data for x in children)
+    return shift + math.log(sum(math.exp(x.data - shift) for x in children))
+
+
+def _softmax_data(children: tuple[Value, ...], log_normalizer: float) -> list[float]:
+    return [math.exp(x.data - log_normalizer) for x in children]
+
+
+def _affine(
+    weights: list[Value],
+    inputs: list[Union[Value, float]],
+    bias: Optional[Value],
+    op: str,
+) -> Value:
+    n = len(weights)
+    assert len(inputs) == n, "Expected one input per weight"
+    inputs = [x if isinstance(x, Value) else Value(x) for x in inputs]
+    children = (*weights, *inputs) if bias is None else (*weights, *inputs, bias)
+
+    activation = _AFFINE_ACTIVATIONS[op](_affine_data(children, n))
+    return Value(activation, children, op, n)
+
+
+def _affine_data(children: tuple[Value, ...], n: int) -> float:
+    # Summed left to right from 0, like the unfused graph, so the result is identical.
+    activation = 0
+    for i in range(n):
+        activation += children[i].data * children[n + i].data
+    if len(children) > 2 * n:
+        activation += children[2 * n].data
+    return activation
+
+
+def _leaf_backward(node: Value, grad_parent: float) -> None:
+    pass
+
+
+def _add_backward(node: Value, grad_parent: float) -> None:
+    left, right = node.children
+    left.grad += grad_parent
+    right.grad += grad_parent
+
+
+def _mul_backward(node: Value, grad_parent: float) -> None:
+    left, right = node.children
+    left.grad += right.data * grad_parent
+    right.grad += left.data * grad_parent
+
+
+def _neg_backward(node: Value, grad_parent: float) -> None:
+    (child,) = node.children
+    child.grad -= grad_parent
+
+
+def _sub_backward(node: Value, grad_parent: float) -> None:
+    left, right = node.children
+    left.grad += grad_parent
+    right.grad -= grad_parent
+
+
+def _div_backward(node: Value, grad_parent: float) -> None:
+    numerator, denominator = node.children
+    numerator.grad += grad_parent / denominator.data
+    denominator.grad -= grad_parent * node.data / denominator.data
+
+
+def _rdiv_backward(node: Value, grad_parent: float) -> None:
+    (denominator,) = node.children
+    denominator.grad -= grad_parent * node.data / denominator.data
+
+
+def _tanh_backward(node: Value, grad_parent: float) -> None:
+    (child,) = node.children
+    local_gradient = 1 - node.data**2
+    child.grad += local_gradient * grad_parent
+
+
+def _pow_backward(node: Value, grad_parent: float) -> None:
+    (base,) = node.children
+    power = node.arg
+    base.grad += (power * base.data ** (power - 1)) * grad_parent
+
+
+def _linear_backward(node: Value, grad_parent: float) -> None:
+    children = node.children
+    n = node.arg
+    for i in range(n):
+        weight = children[i]
+        x = children[n + i]
+        weight.grad += x.data * grad_parent
+        x.grad += weight.data * grad_parent
+    if len(children) > 2 * n:
+        children[2 * n].grad += grad_parent
+
+
+def _affine_activation_backward(node: Value, grad_parent: float) -> None:
+    local_gradient = _activation_derivative(node)
+    _linear_backward(node, local_gradient * grad_parent)
+
+
+def _activation_derivative(node: Value) -> float:
+    # The derivative of each activation follows from its output.
+    output = node.data
+    if node.op == "affine_tanh":
+        return 1 - output**2
+    if node.op == "affine_sigmoid":
+        return output * (1 - output)
+    return 1.0 if output > 0 else 0.0
+
+
+def _exp_backward(node: Value, grad_parent: float) -> None:
+    (child,) = node.children
+    child.grad += node.data * grad_parent
+
+
+def _log_backward(node: Value, grad_parent: float) -> None:
+    (child,) = node.children
+    child.grad += grad_parent / child.data
+
+
+def _relu_backward(node: Value, grad_parent: float) -> None:
+    (child,) = node.children
+    if child.data > 0:
+        child.grad += grad_parent
+
+
+def _sigmoid_backward(node: Value, grad_parent: float) -> None:
+    (child,) = node.children
+    child.grad += node.data * (1 - node.data) * grad_parent
+
+
+def _abs_backward(node: Value, grad_parent: float) -> None:
+    (child,) = node.children
+    child.grad += math.copysign(grad_parent, child.data) if child.data else 0.0
+
+
+def _log_softmax_backward(node: Value, grad_parent: float) -> None:
+    children = node.children
+    i = node.arg
+    # logsumexp(logits) is not stored, but follows from the output of the node.
+    log_normalizer = children[i].data - node.data
+    for x, p in zip(children, _softmax_data(children, log_normalizer)):
+        x.grad -= p * grad_parent
+    children[i].grad += grad_parent
+
+
+def _cross_entropy_backward(node: Value, grad_parent: float) -> None:
+    children = node.children
+    target = node.arg
+    log_normalizer = node.data + children[target].data
+    for x, p in zip(children, _softmax_data(children, log_normalizer)):
+        x.grad += p * grad_parent
+    children[target].grad -= grad_parent
+
+
+BACKWARD_RULES: dict[str, BackwardRule] = {
+    "leaf": _leaf_backward,
+    "add": _add_backward,
+    "mul": _mul_backward,
+    "neg": _neg_backward,
+    "sub": _sub_backward,
+    "div": _div_backward,
+    "rdiv": _rdiv_backward,
+    "tanh": _tanh_backward,
+    "pow": _pow_backward,
+    "linear": _linear_backward,
+    "affine_tanh": _affine_activation_backward,
+    "affine_relu": _affine_activation_backward,
+    "affine_sigmoid": _affine_activation_backward,
+    "exp": _exp_backward,
+    "log": _log_backward,
+    "relu": _relu_backward,
+    "sigmoid": _sigmoid_backward,
+    "abs": _abs_backward,
+    "log_softmax": _log_softmax_backward,
+    "cross_entropy": _cross_entropy_backward,
+}
+
+
+def _leaf_forward(node: Value) -> None:
+    pass
+
+
+def _add_forward(node: Value) -> None:
+    left, right = node.children
+    node.data = left.data + right.data
+
+
+def _mul_forward(node: Value) -> None:
+    left, right = node.children
+    node.data = left.data * right.data
+
+
+def _neg_forward(node: Value) -> None:
+    (child,) = node.children
+    node.data = -child.data
+
+
+def _sub_forward(node: Value) -> None:
+    left, right = node.children
+    node.data = left.data - right.data
+
+
+def _div_forward(node: Value) -> None:
+    numerator, denominator = node.children
+    node.data = numerator.data / denominator.data
+
+
+def _rdiv_forward(node: Value) -> None:
+    (denominator,) = node.children
+    node.data = node.arg / denominator.data
+
+
+def _tanh_forward(node: Value) -> None:
+    (child,) = node.children
+    node.data = math.tanh(child.data)
+
+
+def _pow_forward(node: Value) -> None:
+    (base,) = node.children
+    node.data = base.data**node.arg
+
+
+def _linear_forward(node: Value) -> None:
+    node.data = _affine_data(node.children, node.arg)
+
+
+def _affine_activation_forward(node: Value) -> None:
+    activation = _AFFINE_ACTIVATIONS[node.op]
+    node.data = activation(_affine_data(node.children, node.arg))
+
+
+def _exp_forward(node: Value) -> None:
+    (child,) = node.children
+    node.data = math.exp(child.data)
+
+
+def _log_forward(node: Value) -> None:
+    (child,) = node.children
+    node.data = math.log(child.data)
+
+
+def _relu_forward(node: Value) -> None:
+    (child,) = node.children
+    node.data = max(child.data, 0.0)
+
+
+def _sigmoid_forward(node: Value) -> None:
+    (child,) = node.children
+    node.data = _sigmoid(child.data)
+
+
+def _abs_forward(node: Value) -> None:
+    (child,) = node.children
+    node.data = abs(child.data)
+
+
+def _log_softmax_forward(node: Value) -> None:
+    node.data = node.children[node.arg].data - _log_sum_exp(node.children)
+
+
+def _cross_entropy_forward(node: Value) -> None:
+    node.data = _log_sum_exp(node.children) - node.children[node.arg].data
+
+
+# Recomputes the data of an existing node from its children, used to replay a graph.
+FORWARD_RULES: dict[str, ForwardRule] = {
+    "leaf": _leaf_forward,
+    "add": _add_forward,
+    "mul": _mul_forward,
+    "neg": _neg_forward,
+    "sub": _sub_forward,
+    "div": _div_forward,
+    "rdiv": _rdiv_forward,
+    "tanh": _tanh_forward,
+    "pow": _pow_forward,
+    "linear": _linear_forward,
+    "affine_tanh": _affine_activation_forward,
+    "affine_relu": _affine_activation_forward,
+    "affine_sigmoid": _affine_activation_forward,
+    "exp": _exp_forward,
+    "log": _log_forward,
+    "relu": _relu_forward,
+    "sigmoid": _sigmoid_forward,
+    "abs": _abs_forward,
+    "log_softmax": _log_softmax_forward,
+    "cross_entropy": _cross_entropy_forward,
+}
+
+
+def _add_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    return grad_parent, (1.0, 1.0)
+
+
+def _mul_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    left, right = node.children
+    return grad_parent, (right, left)
+
+
+def _neg_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    return grad_parent, (-1.0,)
+
+
+def _sub_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    return grad_parent, (1.0, -1.0)
+
 
-    def _depth_first_search(node: Value):
-        if node not in visited:
-            visited.add(node)
+def _div_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    _, denominator = node.children
+    return grad_parent, (1 / denominator, -node / denominator)
 
-            for child in node.children:
-                _depth_first_search(child)
 
-            topological_order.append(node)
+def _rdiv_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    (denominator,) = node.children
+    return grad_parent, (-node / denominator,)
+
+
+def _tanh_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    return grad_parent, (1 - node**2,)
+
+
+def _pow_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    (base,) = node.children
+    power = node.arg
+    return grad_parent, (power * base ** (power - 1),)
+
+
+def _linear_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    children = node.children
+    n = node.arg
+    weights, inputs = children[:n], children[n : 2 * n]
+    bias = (1.0,) if len(children) > 2 * n else ()
+    return grad_parent, (*inputs, *weights, *bias)
+
+
+def _affine_activation_graph_backward(
+    node: Value, grad_parent: Value
+) -> GraphGradients:
+    if node.op == "affine_tanh":
+        local_gradient = 1 - node**2
+    elif node.op == "affine_sigmoid":
+        local_gradient = node * (1 - node)
+    else:
+        local_gradient = _activation_derivative(node)
+    return _linear_graph_backward(node, grad_parent * local_gradient)
+
+
+def _exp_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    return grad_parent, (node,)
+
+
+def _log_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    (child,) = node.children
+    return grad_parent, (child**-1,)
+
+
+def _relu_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    return grad_parent, _relu_local_gradients(node)
+
+
+def _sigmoid_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    return grad_parent, (node * (1 - node),)
+
+
+def _abs_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    return grad_parent, _abs_local_gradients(node)
+
+
+def _log_softmax_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    children = node.children
+    i = node.arg
+    log_normalizer = children[i] - node
+    return grad_parent, tuple(
+        float(j == i) - (x - log_normalizer).exp() for j, x in enumerate(children)
+    )
+
+
+def _cross_entropy_graph_backward(node: Value, grad_parent: Value) -> GraphGradients:
+    children = node.children
+    target = node.arg
+    log_normalizer = node + children[target]
+    return grad_parent, tuple(
+        (x - log_normalizer).exp() - float(j == target) for j, x in enumerate(children)
+    )
+
+
+# Like BACKWARD_RULES, but builds Values, so that the gradients can be differentiated
+# again. Each rule returns a gradient and one factor per child: the contribution to
+# the child is their product. `grad` sums all contributions to a child as one node.
+GRAPH_BACKWARD_RULES: dict[str, GraphBackwardRule] = {
+    "add": _add_graph_backward,
+    "mul": _mul_graph_backward,
+    "neg": _neg_graph_backward,
+    "sub": _sub_graph_backward,
+    "div": _div_graph_backward,
+    "rdiv": _rdiv_graph_backward,
+    "tanh": _tanh_graph_backward,
+    "pow": _pow_graph_backward,
+    "linear": _linear_graph_backward,
+    "affine_tanh": _affine_activation_graph_backward,
+    "affine_relu": _affine_activation_graph_backward,
+    "affine_sigmoid": _affine_activation_graph_backward,
+    "exp": _exp_graph_backward,
+    "log": _log_graph_backward,
+    "relu": _relu_graph_backward,
+    "sigmoid": _sigmoid_graph_backward,
+    "abs": _abs_graph_backward,
+    "log_softmax": _log_softmax_graph_backward,
+    "cross_entropy": _cross_entropy_graph_backward,
+}
+
+
+def _add_local_gradients(node: Value) -> tuple[float, ...]:
+    return 1.0, 1.0
+
+
+def _mul_local_gradients(node: Value) -> tuple[float, ...]:
+    left, right = node.children
+    return right.data, left.data
+
+
+def _neg_local_gradients(node: Value) -> tuple[float, ...]:
+    return (-1.0,)
+
+
+def _sub_local_gradients(node: Value) -> tuple[float, ...]:
+    return 1.0, -1.0
+
+
+def _div_local_gradients(node: Value) -> tuple[float, ...]:
+    _, denominator = node.children
+    return 1 / denominator.data, -node.data / denominator.data
+
+
+def _rdiv_local_gradients(node: Value) -> tuple[float, ...]:
+    (denominator,) = node.children
+    return (-node.data / denominator.data,)
+
+
+def _tanh_local_gradients(node: Value) -> tuple[float, ...]:
+    return (1 - node.data**2,)
+
+
+def _pow_local_gradients(node: Value) -> tuple[float, ...]:
+    (base,) = node.children
+    power = node.arg
+    return (power * base.data ** (power - 1),)
+
+
+def _linear_local_gradients(node: Value, scale: float = 1.0) -> tuple[float, ...]:
+    children = node.children
+    n = node.arg
+    bias = (scale,) if len(children) > 2 * n else ()
+    return (
+        *(scale * x.data for x in children[n : 2 * n]),
+        *(scale * weight.data for weight in children[:n]),
+        *bias,
+    )
+
+
+def _affine_activation_local_gradients(node: Value) -> tuple[float, ...]:
+    return _linear_local_gradients(node, _activation_derivative(node))
+
+
+def _exp_local_gradients(node: Value) -> tuple[float, ...]:
+    return (node.data,)
+
+
+def _log_local_gradients(node: Value) -> tuple[float, ...]:
+    (child,) = node.children
+    return (1 / child.data,)
+
+
+def _relu_local_gradients(node: Value) -> tuple[float, ...]:
+    (child,) = node.children
+    return (1.0 if child.data > 0 else 0.0,)
+
+
+def _sigmoid_local_gradients(node: Value) -> tuple[float, ...]:
+    return (node.data * (1 - node.data),)
+
+
+def _abs_local_gradients(node: Value) -> tuple[float, ...]:
+    (child,) = node.children
+    return (math.copysign(1.0, child.data) if child.data else 0.0,)
+
+
+def _log_softmax_local_gradients(node: Value) -> tuple[float, ...]:
+    children = node.children
+    i = node.arg
+    probabilities = _softmax_data(children, children[i].data - node.data)
+    return tuple(float(j == i) - p for j, p in enumerate(probabilities))
+
+
+def _cross_entropy_local_gradients(node: Value) -> tuple[float, ...]:
+    children = node.children
+    target = node.arg
+    probabilities = _softmax_data(children, node.data + children[target].data)
+    return tuple(p - float(j == target) for j, p in enumerate(probabilities))
+
+
+# The partial derivative of a node with respect to each of its children. Used where the
+# gradient is not a float in `grad`, e.g. to propagate several gradients at once.
+LOCAL_GRADIENT_RULES: dict[str, LocalGradientRule] = {
+    "add": _add_local_gradients,
+    "mul": _mul_local_gradients,
+    "neg": _neg_local_gradients,
+    "sub": _sub_local_gradients,
+    "div": _div_local_gradients,
+    "rdiv": _rdiv_local_gradients,
+    "tanh": _tanh_local_gradients,
+    "pow": _pow_local_gradients,
+    "linear": _linear_local_gradients,
+    "affine_tanh": _affine_activation_local_gradients,
+    "affine_relu": _affine_activation_local_gradients,
+    "affine_sigmoid": _affine_activation_local_gradients,
+    "exp": _exp_local_gradients,
+    "log": _log_local_gradients,
+    "relu": _relu_local_gradients,
+    "sigmoid": _sigmoid_local_gradients,
+    "abs": _abs_local_gradients,
+    "log_softmax": _log_softmax_local_gradients,
+    "cross_entropy": _cross_entropy_local_gradients,
+}
+
+
+TensorLike = Union["Tensor", np.ndarray, float]
+TensorBackwards = Callable[[np.ndarray], None]
+
+
+def _noop_grad(_: np.ndarray) -> None:
+    pass
+
+
+class Tensor:
+    """A NumPy array node of the computational graph.
+
+    Supports the same operators as `Value`, but each operation is a single node whose
+    forward and backward passes are NumPy kernels. Operands are broadcast like NumPy
+    arrays, and their gradients are summed back to their original shape.
+    """
+
+    __slots__ = ("data", "grad", "children", "_backwards")
+    # Makes NumPy defer to the reflected operators, e.g. array @ tensor -> Tensor.
+    __array_ufunc__ = None
+
+    def __init__(
+        self,
+        data: Union[np.ndarray, float, list],
+        children: tuple[Tensor, ...] = (),
+        _backwards: TensorBackwards = _noop_grad,
+    ):
+        self.data = np.asarray(data, dtype=np.float64)
+        self.grad = np.zeros_like(self.data)
+        if _grad_enabled:
+            self.children = children
+            self._backwards = _backwards
+        else:
+            self.children = ()
+            self._backwards = _noop_grad
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.data.shape
+
+    def __add__(self, other: TensorLike) -> Tensor:
+        """self + other"""
+        other = _as_tensor(other)
+
+        def _backward(grad_parent: np.ndarray) -> None:
+            self.grad += _unbroadcast(grad_parent, self.data.shape)
+            other.grad += _unbroadcast(grad_parent, other.data.shape)
+
+        return Tensor(self.data + other.data, (self, other), _backward)
+
+    def __mul__(self, other: TensorLike) -> Tensor:
+        """self * other"""
+        other = _as_tensor(other)
+
+        def _backward(grad_parent: np.ndarray) -> None:
+            self.grad += _unbroadcast(other.data * grad_parent, self.data.shape)
+            other.grad += _unbroadcast(self.data * grad_parent, other.data.shape)
+
+        return Tensor(self.data * other.data, (self, other), _backward)
+
+    def matmul(self, other: TensorLike) -> Tensor:
+        """self @ other"""
+        other = _as_tensor(other)
+        assert self.data.ndim == 2 and other.data.ndim == 2, "Only support 2D matmul"
+
+        def _backward(grad_parent: np.ndarray) -> None:
+            self.grad += grad_parent @ other.data.T
+            other.grad += self.data.T @ grad_parent
+
+        return Tensor(self.data @ other.data, (self, other), _backward)
+
+    def tanh(self) -> Tensor:
+        output = np.tanh(self.data)
+
+        def _backward(grad_parent: np.ndarray) -> None:
+            self.grad += (1 - output**2) * grad_parent
+
+        return Tensor(output, (self,), _backward)
+
+    def relu(self) -> Tensor:
+        output = np.maximum(self.data, 0.0)
+
+        def _backward(grad_parent: np.ndarray) -> None:
+            self.grad += (output > 0) * grad_parent
+
+        return Tensor(output, (self,), _backward)
+
+    def sigmoid(self) -> Tensor:
+        # Via tanh, which is stable for large |x|.
+        output = 0.5 * (1 + np.tanh(0.5 * self.data))
+
+        def _backward(grad_parent: np.ndarray) -> None:
+            self.grad += output * (1 - output) * grad_parent
+
+        return Tensor(output, (self,), _backward)
+
+    def __pow__(self, power: float) -> Tensor:
+        """self ** power"""
+        assert isinstance(power, (int, float)), "Only support int/float powers"
+
+        def _backward(grad_parent: np.ndarray) -> None:
+            self.grad += (power * self.data ** (power - 1)) * grad_parent
+
+        return Tensor(self.data**power, (self,), _backward)
+
+    def sum(self, axis: Optional[int] = None, keepdims: bool = False) -> Tensor:
+        def _backward(grad_parent: np.ndarray) -> None:
+            if axis is not None and not keepdims:
+                grad_parent = np.expand_dims(grad_parent, axis)
+            self.grad += grad_parent
+
+        return Tensor(self.data.sum(axis=axis, keepdims=keepdims), (self,), _backward)
+
+    def mean(self, axis: Optional[int] = None, keepdims: bool = False) -> Tensor:
+        n = self.data.size if axis is None else self.data.shape[axis]
+        return self.sum(axis=axis, keepdims=keepdims) * (1 / n)
+
+    def backward(self) -> None:
+        order = find_reversed_topological_order(self)
+        # As in `_propagate`: intermediate gradients belong to a single pass. So do those
+        # of the leaves that pass their gradient on, e.g. from `tensor_from_values`.
+        for v in order:
+            if v.children or v._backwards is not _noop_grad:
+                v.grad = np.zeros_like(v.data)
+        self.grad = np.ones_like(self.data)
+
+        for v in order:
+            v._backwards(v.grad)
+
+    def __matmul__(self, other: TensorLike) -> Tensor:
+        return self.matmul(other)
+
+    def __rmatmul__(self, other: TensorLike) -> Tensor:
+        return _as_tensor(other).matmul(self)
+
+    def __neg__(self) -> Tensor:
+        """-self"""
+        return self * -1
+
+    def __radd__(self, other: TensorLike) -> Tensor:
+        """other + self"""
+        return self + other
+
+    def __sub__(self, other: TensorLike) -> Tensor:
+        """self - other"""
+        return self + (-_as_tensor(other))
+
+    def __rsub__(self, other: TensorLike) -> Tensor:
+        """other - self"""
+        return other + (-self)
+
+    def __rmul__(self, other: TensorLike) -> Tensor:
+        """other * self"""
+        return self * other
+
+    def __truediv__(self, other: TensorLike) -> Tensor:
+        """self / other"""
+        return self * _as_tensor(other) ** -1
+
+    def __rtruediv__(self, other: TensorLike) -> Tensor:
+        """other / self"""
+        return other * self**-1
+
+    def __repr__(self) -> str:
+        return f"Tensor(data={self.data})"
+
+
+def tensor_from_values(
+    values: list[Value], shape: Optional[tuple[int, ...]] = None
+) -> Tensor:
+    """Gathers the data of scalar `values` into a leaf Tensor of the given `shape`.
+
+    The gradient of the Tensor flows back into the `grad` of each Value, so a batched
+    Tensor graph can train the same parameters as the scalar graph.
+    """
+
+    def _backward(grad_parent: np.ndarray) -> None:
+        for value, grad in zip(values, grad_parent.ravel().tolist()):
+            value.grad += grad
+
+    data = np.array([value.data for value in values], dtype=np.float64)
+    if shape is not None:
+        data = data.reshape(shape)
+    return Tensor(data, (), _backward)
+
+
+def tensor_from_storage(data: np.ndarray, grad: np.ndarray) -> Tensor:
+    """Wraps a view of parameter storage, e.g. `FlatParameters`, in a leaf Tensor.
+
+    Unlike `tensor_from_values` nothing is gathered or scattered: the gradient of the
+    Tensor is added to `grad` in place with a single array operation.
+    """
+
+    def _backward(grad_parent: np.ndarray) -> None:
+        np.add(grad, grad_parent, out=grad)
+
+    return Tensor(data, (), _backward)
+
+
+def _as_tensor(value: TensorLike) -> Tensor:
+    if isinstance(value, Tensor):
+        return value
+    return Tensor(value)
+
+
+def _unbroadcast(grad: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    """Sums `grad` over the axes that NumPy broadcast to turn `shape` into `grad.shape`."""
+    if grad.shape == shape:
+        return grad
+
+    grad = grad.sum(axis=tuple(range(grad.ndim - len(shape))))
+    broadcast_axes = tuple(
+        i for i, (n, m) in enumerate(zip(shape, grad.shape)) if n == 1 and m != 1
+    )
+    return grad.sum(axis=broadcast_axes, keepdims=True)
+
+
+def grad(output: Value, inputs: list[Value], create_graph: bool = False) -> list[Value]:
+    """Returns the gradient of `output` with respect to each of `inputs`.
+
+    Unlike `Value.backward`, the `grad` of the nodes is left untouched. With
+    `create_graph=True` the gradients are computed with Value operations, so they are
+    part of a graph that can be differentiated again, e.g. for second order methods.
+    """
+    order = find_reversed_topological_order(output)
+    if not create_graph:
+        saved_grads = [v.grad for v in order]
+        for v in order:
+            v.grad = 0.0
+        _propagate(order, [output], [1])
+        reached = set(order)
+        gradients = [Value(float(x.grad) if x in reached else 0.0) for x in inputs]
+        for v, saved_grad in zip(order, saved_grads):
+            v.grad = saved_grad
+        return gradients
+
+    # The gradients and factors of the contributions to each node. They are summed
+    # once all parents are done, as one linear node instead of a mul and add per
+    # contribution, so the graph of the gradient stays about as small as the forward.
+    contributions = {output: ([Value(1.0)], [1.0])}
+    gradients = {}
+    graph_backward_rules = GRAPH_BACKWARD_RULES
+    for node in order:
+        terms = contributions.pop(node, None)
+        if terms is None:
+            continue
+        grads, factors = terms
+        if len(grads) == 1 and not isinstance(factors[0], Value) and factors[0] == 1.0:
+            gradients[node] = grad_node = grads[0]
+        else:
+            gradients[node] = grad_node = linear_combination(grads, factors)
+        if not node.children:
+            continue
+
+        grad_parent, factors = graph_backward_rules[node.op](node, grad_node)
+        for child, factor in zip(node.children, factors):
+            terms = contributions.get(child)
+            if terms is None:
+                contributions[child] = ([grad_parent], [factor])
+            else:
+                terms[0].append(grad_parent)
+                terms[1].append(factor)
+
+    return [gradients.get(x, Value(0.0)) for x in inputs]
+
+
+def backward(
+    roots: list[Value],
+    grad_outputs: Optional[list[float]] = None,
+    retain_graph: bool = True,
+) -> None:
+    """Runs backward for several roots in a single pass over their merged graph.
+
+    Each root is seeded with its entry of `grad_outputs` (1 by default), so the
+    gradients equal those of sum(grad_outputs[i] * roots[i]), a vector-Jacobian
+    product, without building that sum. Shared subgraphs are traversed once.
+    """
+    if grad_outputs is None:
+        grad_outputs = [1] * len(roots)
+    assert len(grad_outputs) == len(roots), "Expected one grad_output per root"
+
+    order = find_reversed_topological_order(*roots)
+    _propagate(order, roots, grad_outputs, retain_graph)
+
+
+def _propagate(
+    order: list[Value],
+    roots: list[Value],
+    grad_outputs: list[float],
+    retain_graph: bool = True,
+) -> None:
+    # Gradients of intermediate nodes belong to a single pass, so a repeated backward
+    # on the same graph starts from zero instead of double counting. Leaves accumulate.
+    for v in order:
+        if v.children:
+            v.grad = 0.0
+    for root in roots:
+        root.grad = 0
+    for root, grad_output in zip(roots, grad_outputs):
+        root.grad += grad_output
+
+    backward_rules = BACKWARD_RULES
+    if retain_graph:
+        for v in order:
+            backward_rules[v.op](v, v.grad)
+        return
+
+    # Once a node has passed its gradient on, neither the order nor the node itself
+    # should keep its children alive.
+    for i, v in enumerate(order):
+        backward_rules[v.op](v, v.grad)
+        v.children = ()
+        v.op = "leaf"
+        v.arg = None
+        order[i] = None
+
+
+def find_reversed_topological_order(root: Value, *roots: Value) -> list[Value]:
+    """Depth first search with an explicit stack, so deep graphs do not hit the recursion limit.
+
+    When several roots are given, their graphs are merged into a single order.
+
+    A node is pushed twice: once to expand its children and once more, below them,
+    to emit it after all of its children have been emitted. No per node containers are
+    allocated, which keeps the garbage collector quiet on graphs with millions of nodes.
+    """
+    expanded = set()
+    emitted = set()
+    topological_order = []
+    stack = [*reversed(roots), root]
+
+    while stack:
+        node = stack.pop()
+        if node in expanded:
+            if node not in emitted:
+                emitted.add(node)
+                topological_order.append(node)
+            continue
 
-    _depth_first_search(root)
+        expanded.add(node)
+        stack.append(node)
+        for child in node.children:
+            if child not in expanded:
+                stack.append(child)
 
-    return list(reversed(topological_order))
+    topological_order.reverse()
+    return topological_order
@@ -0,0 +1,117 @@
+from typing import Callable, Union
+
+import numpy as np
+
+from mini_auto_grad.solution.dual import push_forward
+from mini_auto_grad.solution.engine import (
+    LOCAL_GRADIENT_RULES,
+    Value,
+    backward,
+    find_reversed_topological_order,
+    grad,
+    linear_combination,
+)
+
+Function = Callable[[list[Value]], Union[Value, list[Value]]]
+
+
+def hessian_vector_product(
+    output: Value, inputs: list[Value], vector: list[float]
+) -> list[float]:
+    """Returns H @ vector, with H the Hessian of `output` with respect to `inputs`.
+
+    Uses double backward: the product of the gradient with `vector` is a scalar whose
+    gradient is H @ vector. The cost is independent of the number of inputs and H is
+    never materialized: building the graph of the gradient and differentiating it
+    takes about 7 times a plain `backward` for the MLPs of benchmarks/bench_hvp.py.
+    """
+    assert len(vector) == len(inputs), "Expected one vector element per input"
+    gradients = grad(output, inputs, create_graph=True)
+    directional_derivative = linear_combination(gradients, vector)
+    return [g.data for g in grad(directional_derivative, inputs)]
+
+
+def jvp(
+    function: Function, x: list[float], tangents: list[float]
+) -> tuple[list[float], list[float]]:
+    """Returns the outputs of `function` at `x` and its Jacobian-vector product J @ tangents.
+
+    Computed in forward mode, so it costs a single pass regardless of the number of
+    outputs.
+    """
+    assert len(tangents) == len(x), "Expected one tangent per input"
+    inputs, outputs = _record(function, x)
+    duals = push_forward(outputs, inputs, tangents)
+    return [o.data for o in outputs], [float(d.tangent) for d in duals]
+
+
+def vjp(
+    function: Function, x: list[float], cotangents: list[float]
+) -> tuple[list[float], list[float]]:
+    """Returns the outputs of `function` at `x` and the vector-Jacobian product cotangents @ J.
+
+    All outputs are seeded with their cotangent and propagated in one reverse pass.
+    """
+    inputs, outputs = _record(function, x)
+    backward(outputs, cotangents)
+    return [o.data for o in outputs], [float(x_i.grad) for x_i in inputs]
+
+
+def jacobian(function: Function, x: list[float], mode: str = "auto") -> np.ndarray:
+    """Returns the (n_outputs, n_inputs) Jacobian of `function` at `x`.
+
+    Both modes record the graph once and sweep it once with vector-valued slots:
+    forward mode pushes one tangent per input, reverse mode propagates one gradient row
+    per output. "auto" picks forward mode when there are at most as many inputs as
+    outputs.
+    """
+    assert mode in ("auto", "forward", "reverse"), f"Unknown mode {mode}"
+    inputs, outputs = _record(function, x)
+    if mode == "auto":
+        mode = "forward" if len(inputs) <= len(outputs) else "reverse"
+
+    if mode == "forward":
+        directions = list(np.eye(len(inputs)))
+        duals = push_forward(outputs, inputs, directions)
+        return np.array(
+            [np.broadcast_to(d.tangent, len(inputs)) for d in duals], dtype=np.float64
+        )
+
+    return _reverse_jacobian(outputs, inputs)
+
+
+def _reverse_jacobian(outputs: list[Value], inputs: list[Value]) -> np.ndarray:
+    # slots[node][i] is the gradient of outputs[i] with respect to node. The `grad` of
+    # the nodes is not used, so it is left untouched.
+    n_outputs = len(outputs)
+    slots = {}
+    for i, output in enumerate(outputs):
+        slots.setdefault(output, np.zeros(n_outputs))[i] += 1.0
+
+    local_gradient_rules = LOCAL_GRADIENT_RULES
+    for node in find_reversed_topological_order(*outputs):
+        if not node.children:
+            continue
+        # Only the slots of the leaves are needed after they have been propagated.
+        slot = slots.pop(node, None)
+        if slot is None:
+            continue
+        local_gradients = local_gradient_rules[node.op](node)
+        for child, local_gradient in zip(node.children, local_gradients):
+            contribution = local_gradient * slot
+            if child in slots:
+                slots[child] += contribution
+            else:
+                slots[child] = contribution
+
+    jacobian_matrix = np.zeros((n_outputs, len(inputs)))
+    for j, x in enumerate(inputs):
+        if x in slots:
+            jacobian_matrix[:, j] = slots[x]
+    return jacobian_matrix
+
+
+def _record(function: Function, x: list[float]) -> tuple[list[Value], list[Value]]:
+    inputs = [Value(x_i) for x_i in x]
+    outputs = function(inputs)
+    return inputs, [outputs] if isinstance(outputs, Value) else list(outputs)
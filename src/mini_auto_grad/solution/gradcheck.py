@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+from typing import Callable, Optional
+
+import numpy as np
+
+from mini_auto_grad.solution.engine import Value, no_grad
+from mini_auto_grad.solution.nn import Module
+
+Function = Callable[[list[Value]], Value]
+Loss = Callable[[Module], Value]
+
+# The function under test and its parameters, inherited by the forked workers so
+# closures and modules don't have to be pickled.
+_evaluate: Optional[Callable[[], Value]] = None
+_parameters: list[Value] = []
+
+
+class GradientCheck:
+    """The analytic and numerical gradients of a gradient check, one entry per parameter.
+
+    The relative error is |analytic - numerical| / max(|analytic|, |numerical|, 1), so
+    it falls back to the absolute error for gradients that are (close to) zero.
+    """
+
+    def __init__(self, analytic: np.ndarray, numerical: np.ndarray) -> None:
+        self.analytic = analytic
+        self.numerical = numerical
+        scale = np.maximum(np.maximum(np.abs(analytic), np.abs(numerical)), 1.0)
+        self.relative_errors = np.abs(analytic - numerical) / scale
+
+    @property
+    def max_relative_error(self) -> float:
+        return float(self.relative_errors.max(initial=0.0))
+
+    def passed(self, tolerance: float = 1e-5) -> bool:
+        return self.max_relative_error <= tolerance
+
+    def __repr__(self) -> str:
+        return (
+            f"GradientCheck(n_parameters={len(self.analytic)}, "
+            f"max_relative_error={self.max_relative_error:.3g})"
+        )
+
+
+def check_gradients(
+    function: Function,
+    x: list[float],
+    eps: float = 1e-6,
+    n_workers: Optional[int] = None,
+) -> GradientCheck:
+    """Compares the gradient of `function` at `x` from `backward` with central differences."""
+    inputs = [Value(x_i) for x_i in x]
+    return _check(lambda: function(inputs), inputs, eps, n_workers)
+
+
+def check_module_gradients(
+    module: Module,
+    loss: Loss,
+    eps: float = 1e-6,
+    n_workers: Optional[int] = None,
+) -> GradientCheck:
+    """Compares the gradient of `loss(module)` with respect to the parameters of `module`
+    from `backward` with central differences.
+    """
+    return _check(lambda: loss(module), module.parameters(), eps, n_workers)
+
+
+def _check(
+    evaluate: Callable[[], Value],
+    parameters: list[Value],
+    eps: float,
+    n_workers: Optional[int],
+) -> GradientCheck:
+    # The loss may be a batched Tensor, so use backward instead of `engine.grad`, and
+    # give back the grads the parameters had, e.g. accumulated in training.
+    saved_grads = [p.grad for p in parameters]
+    for p in parameters:
+        p.grad = 0.0
+    try:
+        evaluate().backward()
+        analytic = np.array([float(p.grad) for p in parameters])
+    finally:
+        for p, saved_grad in zip(parameters, saved_grads):
+            p.grad = saved_grad
+
+    global _evaluate, _parameters
+    _evaluate, _parameters = evaluate, parameters
+    try:
+        numerical = np.array(_numerical_gradients(len(parameters), eps, n_workers))
+    finally:
+        _evaluate, _parameters = None, []
+
+    return GradientCheck(analytic, numerical)
+
+
+def _numerical_gradients(
+    n_parameters: int, eps: float, n_workers: Optional[int]
+) -> list[float]:
+    """Evaluates the 2 * n_parameters perturbed forward passes over a pool of processes.
+
+    The pool needs the fork start method to share the function under test; on
+    platforms without it the passes run in this process.
+    """
+    n_workers = min(n_workers or os.cpu_count() or 1, n_parameters)
+    if n_workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return _central_differences(range(n_parameters), eps)
+
+    chunks = np.array_split(np.arange(n_parameters), n_workers)
+    with multiprocessing.get_context("fork").Pool(n_workers) as pool:
+        results = pool.starmap(_central_differences, [(c, eps) for c in chunks])
+    return [g for chunk in results for g in chunk]
+
+
+def _central_differences(indices, eps: float) -> list[float]:
+    gradients = []
+    with no_grad():
+        for i in indices:
+            p = _parameters[i]
+            original = p.data
+            p.data = original + eps
+            upper = float(_evaluate().data)
+            p.data = original - eps
+            lower = float(_evaluate().data)
+            p.data = original
+            gradients.append((upper - lower) / (2 * eps))
+    return gradients
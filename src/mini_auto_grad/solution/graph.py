@@ -0,0 +1,187 @@
+import json
+import os
+from collections import Counter
+from typing import Union
+
+from mini_auto_grad.solution.engine import (
+    AFFINE_OPS,
+    Value,
+    find_reversed_topological_order,
+)
+
+Roots = Union[Value, list[Value]]
+Path = Union[str, os.PathLike]
+
+_AFFINE_OPS = set(AFFINE_OPS.values())
+
+
+class SummaryNode:
+    """A node of an exported graph: a single Value or a group of collapsed Neurons."""
+
+    def __init__(self, index: int, op: str, label: str) -> None:
+        self.index = index
+        self.op = op
+        self.label = label
+        self.count = 1
+        self.parameters = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.index,
+            "op": self.op,
+            "label": self.label,
+            "count": self.count,
+            "parameters": self.parameters,
+        }
+
+
+class GraphSummary:
+    """The nodes and edges (from child to parent, in the direction of the data) of a graph.
+
+    With `collapse=True` every group of fused Neuron nodes (`linear` and `affine_*` ops)
+    with the same op and the same inputs, i.e. a `Layer`, becomes one summary node.
+    Weights and biases that are used by a single Neuron are folded into its node, so an
+    MLP exports as one node per layer plus its inputs.
+    """
+
+    def __init__(self, roots: Roots, collapse: bool = True) -> None:
+        roots = [roots] if isinstance(roots, Value) else list(roots)
+        order = find_reversed_topological_order(*roots)
+        self.statistics = graph_statistics(roots, order)
+
+        self.nodes: list[SummaryNode] = []
+        summary_of: dict[Value, Union[SummaryNode, None]] = {}
+        if collapse:
+            n_consumers = _count_consumers(order)
+            for node in order:
+                if node.op in _AFFINE_OPS:
+                    for child in _parameters_of(node):
+                        if not child.children and n_consumers[child] == 1:
+                            summary_of[child] = None
+
+        groups: dict[tuple, SummaryNode] = {}
+        for node in reversed(order):
+            if node in summary_of:
+                continue
+            if not collapse or node.op not in _AFFINE_OPS:
+                summary_of[node] = self._add(node.op, _label(node))
+                continue
+
+            n = node.arg
+            key = (node.op, n, *map(id, node.children[n : 2 * n]))
+            summary = groups.get(key)
+            if summary is None:
+                summary = groups[key] = self._add(node.op, "")
+            else:
+                summary.count += 1
+            summary.label = f"{summary.count} x {node.op}(n={n})"
+            summary.parameters += sum(
+                summary_of.get(p, True) is None for p in _parameters_of(node)
+            )
+            summary_of[node] = summary
+
+        edges: Counter[tuple[int, int]] = Counter()
+        for node in order:
+            parent = summary_of[node]
+            for child in node.children:
+                child_summary = summary_of[child]
+                if child_summary is not None and child_summary is not parent:
+                    edges[child_summary.index, parent.index] += 1
+        self.edges = [
+            (source, target, count) for (source, target), count in edges.items()
+        ]
+
+    def _add(self, op: str, label: str) -> SummaryNode:
+        node = SummaryNode(len(self.nodes), op, label)
+        self.nodes.append(node)
+        return node
+
+    def to_dict(self) -> dict:
+        return {
+            "nodes": [node.to_dict() for node in self.nodes],
+            "edges": [
+                {"source": source, "target": target, "count": count}
+                for source, target, count in self.edges
+            ],
+            "statistics": self.statistics,
+        }
+
+    def to_dot(self) -> str:
+        lines = ["digraph {", "  rankdir=LR;"]
+        for node in self.nodes:
+            shape = "box" if node.count > 1 or node.parameters else "ellipse"
+            label = node.label.replace('"', '\\"')
+            if node.parameters:
+                label += f"\\n{node.parameters} parameters"
+            lines.append(f'  n{node.index} [label="{label}", shape={shape}];')
+        for source, target, count in self.edges:
+            attributes = f' [label="{count}"]' if count > 1 else ""
+            lines.append(f"  n{source} -> n{target}{attributes};")
+        lines.append("}")
+        return "\n".join(lines)
+
+
+def export_graph(roots: Roots, path: Path, collapse: bool = True) -> GraphSummary:
+    """Writes the graph of `roots` to `path` as Graphviz DOT, or as JSON for a .json path."""
+    summary = GraphSummary(roots, collapse)
+    with open(path, "w") as f:
+        if os.fspath(path).endswith(".json"):
+            json.dump(summary.to_dict(), f, indent=2)
+        else:
+            f.write(summary.to_dot())
+    return summary
+
+
+def graph_statistics(roots: Roots, order: Union[list[Value], None] = None) -> dict:
+    """The size and shape of the graph of `roots`.
+
+    The depth of a node is the length of the longest path from a root to it, and its
+    fan-out is the number of nodes that use it. The histograms count the nodes per
+    depth and per fan-out, a long tail in the depth histogram hints at a chain such as
+    `sum()` over Values.
+    """
+    if order is None:
+        roots = [roots] if isinstance(roots, Value) else list(roots)
+        order = find_reversed_topological_order(*roots)
+
+    depths = node_depths(order)
+    fan_outs = _count_consumers(order)
+    return {
+        "nodes": len(order),
+        "edges": sum(len(node.children) for node in order),
+        "depth": max(depths.values(), default=0),
+        "ops": dict(Counter(node.op for node in order)),
+        "depth_histogram": _histogram(depths.values()),
+        "fan_out_histogram": _histogram(fan_outs[node] for node in order),
+    }
+
+
+def node_depths(order: list[Value]) -> dict[Value, int]:
+    """The longest path from a root to every node of a reversed topological `order`."""
+    depths: dict[Value, int] = {}
+    for node in order:
+        depth = depths.setdefault(node, 0) + 1
+        for child in node.children:
+            if depths.get(child, -1) < depth:
+                depths[child] = depth
+    return depths
+
+
+def _count_consumers(order: list[Value]) -> Counter[Value]:
+    return Counter(child for node in order for child in node.children)
+
+
+def _parameters_of(node: Value) -> tuple[Value, ...]:
+    # The weights and the bias of a fused affine node.
+    n = node.arg
+    return (*node.children[:n], *node.children[2 * n :])
+
+
+def _histogram(values) -> dict[int, int]:
+    return dict(sorted(Counter(values).items()))
+
+
+def _label(node: Value) -> str:
+    if node.op == "leaf":
+        return f"{node.data:.4g}"
+    return f"{node.op} | {node.data:.4g}"
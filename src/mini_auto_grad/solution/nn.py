@@ -1,87 +1,377 @@
 import abc
 import random
-from typing import Union
+from typing import Optional, Union
 
-from mini_auto_grad.solution.engine import Value
+import numpy as np
+
+from mini_auto_grad.solution.engine import (
+    ACTIVATIONS,
+    Tensor,
+    Value,
+    ValueView,
+    affine_activation,
+    no_grad,
+    tensor_from_storage,
+    tensor_from_values,
+)
+
+Batch = Union[Tensor, np.ndarray]
+Features = Union[list[float], np.ndarray]
+
+# The activations applied to whole arrays, for `predict`.
+ARRAY_ACTIVATIONS = {
+    "identity": lambda x: x,
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "sigmoid": lambda x: 0.5 * (1 + np.tanh(0.5 * x)),
+}
+
+
+class FlatParameters:
+    """The data and gradients of all parameters of a module as two contiguous arrays."""
+
+    def __init__(self, data: np.ndarray, grad: np.ndarray) -> None:
+        self.data = data
+        self.grad = grad
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"FlatParameters(n_parameters={len(self)})"
 
 
 class Module(abc.ABC):
+    flat: Optional[FlatParameters] = None
+
     def zero_grad(self) -> None:
+        if self.flat is not None:
+            self.flat.grad[:] = 0.0
+            return
+
         for p in self.parameters():
             p.grad = 0.0
 
+    def flatten_parameters(self) -> FlatParameters:
+        """Moves the data and gradients of all parameters into two contiguous arrays.
+
+        The parameters are replaced by `ValueView`s of the arrays, in the order of
+        `parameters()`, and submodules get slices of the same arrays. Call it on the
+        outermost module, before building graphs with it.
+        """
+        parameters = self.parameters()
+        data = np.array([p.data for p in parameters], dtype=np.float64)
+        grad = np.array([p.grad for p in parameters], dtype=np.float64)
+        self._use_storage(data, grad)
+        return self.flat
+
+    def _use_storage(self, data: np.ndarray, grad: np.ndarray) -> None:
+        """Replaces the parameters by views of `data` and `grad`."""
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support flat parameters"
+        )
+
     @abc.abstractmethod
     def parameters(self) -> list[Value]:
         pass
 
+    def predict(self, x: Features):
+        """Inference mode: evaluates the module on floats without building a graph.
+
+        The built-in modules evaluate a list of floats with plain Python floats, straight
+        from the `data` of the parameters. A 1D or (N, features) array is evaluated with
+        NumPy straight from the flat storage, so it needs `flatten_parameters()` first.
+        By default the module is called under `no_grad` instead.
+        """
+        with no_grad():
+            output = self(x)
+        if isinstance(output, list):
+            return [o.data for o in output]
+        return output.data
+
 
 class Neuron(Module):
-    def __init__(self, n_features: int, non_linear: bool = True) -> None:
-        self.weights = [Value(random.uniform(-1, 1)) for _ in range(n_features)]
-        self.bias = Value(0)
+    def __init__(
+        self,
+        n_features: int,
+        non_linear: bool = True,
+        activation: str = "tanh",
+        flat: Optional[FlatParameters] = None,
+    ) -> None:
+        """`activation` is one of "tanh", "relu", "sigmoid" or "identity", and is only
+        applied when `non_linear` is True.
+
+        Pass `flat` to use existing parameters, `n_features` weights followed by the
+        bias, instead of randomly initialized ones.
+        """
+        assert activation in ACTIVATIONS, f"Unknown activation {activation!r}"
+        self.n_features = n_features
         self.non_linear = non_linear
+        self.activation = activation if non_linear else "identity"
+        if flat is not None:
+            assert len(flat) == n_features + 1, "Expected n_features + 1 parameters"
+            self._use_storage(flat.data, flat.grad)
+        else:
+            self.weights = [Value(random.uniform(-1, 1)) for _ in range(n_features)]
+            self.bias = Value(0)
+
+    @property
+    def weights(self) -> list[Value]:
+        if self._weights is None:
+            # Views are created on first use, so large flat models are set up at once.
+            data, grad = self.flat.data, self.flat.grad
+            self._weights = [ValueView(data, grad, i) for i in range(self.n_features)]
+        return self._weights
+
+    @weights.setter
+    def weights(self, weights: list[Value]) -> None:
+        self._weights = weights
+
+    @property
+    def bias(self) -> Value:
+        if self._bias is None:
+            self._bias = ValueView(self.flat.data, self.flat.grad, self.n_features)
+        return self._bias
+
+    @bias.setter
+    def bias(self, bias: Value) -> None:
+        self._bias = bias
 
     def parameters(self) -> list[Value]:
         return self.weights + [self.bias]
 
+    def _use_storage(self, data: np.ndarray, grad: np.ndarray) -> None:
+        self._weights = None
+        self._bias = None
+        self.flat = FlatParameters(data, grad)
+
     def __call__(self, x: list[Union[Value, float]]) -> Value:
-        """This is a function f(x) = b + \sum_{i=0}^N x_i * w_i"""
-        activation = sum(w_i * x_i for w_i, x_i in zip(self.weights, x)) + self.bias
+        r"""This is a function f(x) = b + \sum_{i=0}^N x_i * w_i
+
+        If x is an (N, n_features) array or Tensor, the whole batch is evaluated at once
+        and an (N,) Tensor is returned.
+        """
+        if _is_batch(x):
+            return self._forward_batch(x)
+
+        return affine_activation(self.weights, x, self.bias, self.activation)
+
+    def _forward_batch(self, x: Batch) -> Tensor:
+        weights = tensor_from_values(self.weights)
+        bias = tensor_from_values([self.bias], ())
+        return _activate((weights * x).sum(axis=1) + bias, self.activation)
 
-        if self.non_linear:
-            return activation.tanh()
+    def predict(self, x: Features) -> Union[float, np.ndarray]:
+        if isinstance(x, np.ndarray):
+            _assert_flat(self)
+            weights, bias = self.flat.data[:-1], self.flat.data[-1]
+            return ARRAY_ACTIVATIONS[self.activation](x @ weights + bias)
 
-        return activation
+        if self.flat is not None:
+            *weights, bias = self.flat.data.tolist()
+        else:
+            weights, bias = [w.data for w in self.weights], self.bias.data
+        activation = sum(w * x_i for w, x_i in zip(weights, x))
+        activation += bias
+        return ACTIVATIONS[self.activation](activation)
 
     def __repr__(self) -> str:
-        return f"Neuron(n_features={len(self.weights)}, non_linear={self.non_linear})"
+        return f"Neuron(n_features={self.n_features}, activation={self.activation!r})"
 
 
 class Layer(Module):
     def __init__(
-        self, n_features_in: int, n_features_out: int, non_linear: bool
+        self,
+        n_features_in: int,
+        n_features_out: int,
+        non_linear: bool,
+        activation: str = "tanh",
+        flat: Optional[FlatParameters] = None,
     ) -> None:
+        """Pass `flat` to use existing parameters, laid out like `flatten_parameters`,
+        instead of randomly initialized ones.
+        """
         self.n_features_in = n_features_in
         self.n_features_out = n_features_out
         self.non_linear = non_linear
+        self.activation = activation if non_linear else "identity"
 
-        self.neurons = [
-            Neuron(n_features_in, non_linear) for _ in range(n_features_out)
-        ]
+        if flat is None:
+            self.neurons = [
+                Neuron(n_features_in, non_linear, activation)
+                for _ in range(n_features_out)
+            ]
+        else:
+            self.neurons = [
+                Neuron(n_features_in, non_linear, activation, part)
+                for part in self._split(flat)
+            ]
+            self.flat = flat
 
     def __call__(self, x) -> list[Value]:
-        """This function that takes $n$ inputs and uses $m$ `Neuron` functions to map it to $m$ output features."""
+        """This function that takes $n$ inputs and uses $m$ `Neuron` functions to map it to $m$ output features.
+
+        If x is an (N, n_features_in) array or Tensor, the whole batch is evaluated at once
+        and an (N, n_features_out) Tensor is returned.
+        """
+        if _is_batch(x):
+            return self._forward_batch(x)
+
+        # Wrap float inputs once, so the neurons share them instead of each wrapping them.
+        x = [x_i if isinstance(x_i, Value) else Value(x_i) for x_i in x]
         return [n(x) for n in self.neurons]
 
+    def _forward_batch(self, x: Batch) -> Tensor:
+        if self.flat is not None:
+            data = self.flat.data.reshape(self.n_features_out, -1)
+            grad = self.flat.grad.reshape(self.n_features_out, -1)
+            weights = tensor_from_storage(data[:, :-1].T, grad[:, :-1].T)
+            bias = tensor_from_storage(data[:, -1], grad[:, -1])
+        else:
+            weights = tensor_from_values(
+                [n.weights[i] for i in range(self.n_features_in) for n in self.neurons],
+                (self.n_features_in, self.n_features_out),
+            )
+            bias = tensor_from_values([n.bias for n in self.neurons])
+        # One activation node for the output of the whole layer.
+        return _activate(x @ weights + bias, self.activation)
+
+    def predict(self, x: Features) -> Union[list[float], np.ndarray]:
+        if isinstance(x, np.ndarray):
+            _assert_flat(self)
+            # One row of weights followed by the bias per neuron, no copy needed.
+            table = self.flat.data.reshape(self.n_features_out, -1)
+            activation = x @ table[:, :-1].T + table[:, -1]
+            return ARRAY_ACTIVATIONS[self.activation](activation)
+
+        return [n.predict(x) for n in self.neurons]
+
     def parameters(self) -> list[Value]:
         return [p for n in self.neurons for p in n.parameters()]
 
+    def _use_storage(self, data: np.ndarray, grad: np.ndarray) -> None:
+        self.flat = FlatParameters(data, grad)
+        for n, part in zip(self.neurons, self._split(self.flat)):
+            n._use_storage(part.data, part.grad)
+
+    def _split(self, flat: FlatParameters) -> list[FlatParameters]:
+        return _split(flat, [self.n_features_in + 1] * self.n_features_out)
+
     def __repr__(self):
-        return f"Layer({self.n_features_in}, {self.n_features_out}, {self.non_linear})"
+        return (
+            f"Layer({self.n_features_in}, {self.n_features_out}, "
+            f"{self.non_linear}, {self.activation!r})"
+        )
 
 
 class MLP(Module):
-    def __init__(self, sizes: list[int]) -> None:
+    def __init__(
+        self,
+        sizes: list[int],
+        activation: str = "tanh",
+        output_activation: Optional[str] = None,
+        flat: Optional[FlatParameters] = None,
+    ) -> None:
+        """`activation` is applied by the hidden layers and `output_activation` by the
+        last one, by default the same. Pass `output_activation="identity"` for a linear
+        output, e.g. for regression with relu or sigmoid hidden layers.
+
+        Pass `flat` to use existing parameters, laid out like `flatten_parameters`,
+        instead of randomly initialized ones.
+        """
+        if output_activation is None:
+            output_activation = activation
         self.sizes = sizes
-        self.layers = _create_layers(sizes)
+        self.activation = activation
+        self.output_activation = output_activation
+        self.layers = _create_layers(sizes, activation, output_activation, flat)
+        if flat is not None:
+            self.flat = flat
 
     def parameters(self):
         return [p for layer in self.layers for p in layer.parameters()]
 
+    def _use_storage(self, data: np.ndarray, grad: np.ndarray) -> None:
+        self.flat = FlatParameters(data, grad)
+        for layer, part in zip(
+            self.layers, _split(self.flat, _layer_lengths(self.sizes))
+        ):
+            layer._use_storage(part.data, part.grad)
+
     def __call__(self, x):
         for layer in self.layers:
             x = layer(x)
         return x
 
+    def predict(self, x: Features) -> Union[list[float], np.ndarray]:
+        for layer in self.layers:
+            x = layer.predict(x)
+        return x
+
     def __repr__(self):
-        return f"MLP({self.sizes})"
+        return f"MLP({self.sizes}, {self.activation!r}, {self.output_activation!r})"
 
 
-def _create_layers(sizes: list[int]) -> list[Layer]:
+def _create_layers(
+    sizes: list[int],
+    activation: str,
+    output_activation: str,
+    flat: Optional[FlatParameters] = None,
+) -> list[Layer]:
     layers = []
+    parts = [None] * len(sizes) if flat is None else _split(flat, _layer_lengths(sizes))
 
     for i in range(len(sizes) - 1):
-        is_not_final_layer = i != len(sizes) - 1
-        layers.append(Layer(sizes[i], sizes[i + 1], non_linear=is_not_final_layer))
+        is_final_layer = i == len(sizes) - 2
+        layer_activation = output_activation if is_final_layer else activation
+        layers.append(
+            Layer(
+                sizes[i],
+                sizes[i + 1],
+                non_linear=layer_activation != "identity",
+                activation=layer_activation,
+                flat=parts[i],
+            )
+        )
 
     return layers
+
+
+def n_parameters(sizes: list[int]) -> int:
+    """The number of parameters of `MLP(sizes)`."""
+    return sum(_layer_lengths(sizes))
+
+
+def _layer_lengths(sizes: list[int]) -> list[int]:
+    return [(n_in + 1) * n_out for n_in, n_out in zip(sizes, sizes[1:])]
+
+
+def _split(flat: FlatParameters, lengths: list[int]) -> list[FlatParameters]:
+    assert len(flat) == sum(lengths), f"Expected {sum(lengths)} parameters"
+    parts = []
+    start = 0
+    for length in lengths:
+        end = start + length
+        parts.append(FlatParameters(flat.data[start:end], flat.grad[start:end]))
+        start = end
+    return parts
+
+
+def _is_batch(x) -> bool:
+    # A 1D array is a single sample, evaluated like a list of floats.
+    return isinstance(x, Tensor) or (isinstance(x, np.ndarray) and x.ndim == 2)
+
+
+def _assert_flat(module: Module) -> None:
+    # Gathering the weights from the Values on every call would cost more than the
+    # matmul, and a cached copy would go stale when the Values are updated.
+    assert module.flat is not None, (
+        f"{type(module).__name__}.predict on arrays needs flat parameters, "
+        "call flatten_parameters() first"
+    )
+
+
+def _activate(x: Tensor, activation: str) -> Tensor:
+    if activation == "identity":
+        return x
+    return getattr(x, activation)()
@@ -0,0 +1,149 @@
+import abc
+from typing import Union
+
+import numpy as np
+
+from mini_auto_grad.solution.engine import Value
+from mini_auto_grad.solution.nn import FlatParameters
+
+
+class Optimizer(abc.ABC):
+    """Updates a list of parameters with one vectorized NumPy operation per step.
+
+    The `data` and `grad` of the parameters are gathered into contiguous buffers that
+    are allocated once, the update rule is applied to the buffers in place, and the
+    new data is written back to the parameters. When given the `FlatParameters` of a
+    module, the update is applied to its arrays directly, without gathering.
+    """
+
+    def __init__(
+        self, parameters: Union[list[Value], FlatParameters], lr: float
+    ) -> None:
+        if isinstance(parameters, FlatParameters):
+            self.flat = parameters
+            self.parameters = []
+            self.data = parameters.data
+        else:
+            self.flat = None
+            self.parameters = list(parameters)
+            self.data = np.zeros(len(self.parameters))
+        self.lr = lr
+        self.grad = np.zeros(len(self.data))
+
+    def zero_grad(self) -> None:
+        if self.flat is not None:
+            self.flat.grad[:] = 0.0
+            return
+
+        for p in self.parameters:
+            p.grad = 0.0
+
+    def step(self) -> None:
+        # The update rules use self.grad as scratch space, so it is always a copy.
+        if self.flat is not None:
+            np.copyto(self.grad, self.flat.grad)
+            self._update(self.data, self.grad)
+            return
+
+        self.data[:] = [p.data for p in self.parameters]
+        self.grad[:] = [p.grad for p in self.parameters]
+
+        self._update(self.data, self.grad)
+
+        for p, data in zip(self.parameters, self.data.tolist()):
+            p.data = data
+
+    @abc.abstractmethod
+    def _update(self, data: np.ndarray, grad: np.ndarray) -> None:
+        """Updates `data` in place given the gradient `grad`."""
+
+
+class SGD(Optimizer):
+    def __init__(
+        self,
+        parameters: Union[list[Value], FlatParameters],
+        lr: float,
+        momentum: float = 0.0,
+    ) -> None:
+        super().__init__(parameters, lr)
+        self.momentum = momentum
+        self.velocity = np.zeros_like(self.data)
+
+    def _update(self, data: np.ndarray, grad: np.ndarray) -> None:
+        velocity = self.velocity
+        velocity *= self.momentum
+        velocity += grad
+        # grad is gathered again on the next step, so it can hold the scaled step.
+        np.multiply(velocity, self.lr, out=grad)
+        data -= grad
+
+
+class RMSProp(Optimizer):
+    def __init__(
+        self,
+        parameters: Union[list[Value], FlatParameters],
+        lr: float = 1e-2,
+        alpha: float = 0.99,
+        eps: float = 1e-8,
+    ) -> None:
+        super().__init__(parameters, lr)
+        self.alpha = alpha
+        self.eps = eps
+        self.square_average = np.zeros_like(self.data)
+        self._denominator = np.zeros_like(self.data)
+
+    def _update(self, data: np.ndarray, grad: np.ndarray) -> None:
+        square_average = self.square_average
+        denominator = self._denominator
+        square_average *= self.alpha
+        np.multiply(grad, grad, out=denominator)
+        denominator *= 1 - self.alpha
+        square_average += denominator
+
+        np.sqrt(square_average, out=denominator)
+        denominator += self.eps
+        grad /= denominator
+        grad *= self.lr
+        data -= grad
+
+
+class Adam(Optimizer):
+    def __init__(
+        self,
+        parameters: Union[list[Value], FlatParameters],
+        lr: float = 1e-3,
+        betas: tuple[float, float] = (0.9, 0.999),
+        eps: float = 1e-8,
+    ) -> None:
+        super().__init__(parameters, lr)
+        self.betas = betas
+        self.eps = eps
+        self.t = 0
+        self.first_moment = np.zeros_like(self.data)
+        self.second_moment = np.zeros_like(self.data)
+        self._denominator = np.zeros_like(self.data)
+
+    def _update(self, data: np.ndarray, grad: np.ndarray) -> None:
+        beta_1, beta_2 = self.betas
+        self.t += 1
+
+        first_moment = self.first_moment
+        second_moment = self.second_moment
+        denominator = self._denominator
+
+        first_moment *= beta_1
+        np.multiply(grad, 1 - beta_1, out=denominator)
+        first_moment += denominator
+
+        second_moment *= beta_2
+        grad *= grad
+        grad *= 1 - beta_2
+        second_moment += grad
+
+        # lr * m_hat / (sqrt(v_hat) + eps), with the bias corrections folded into scalars.
+        np.sqrt(second_moment, out=denominator)
+        denominator /= np.sqrt(1 - beta_2**self.t)
+        denominator += self.eps
+        np.divide(first_moment, denominator, out=grad)
+        grad *= self.lr / (1 - beta_1**self.t)
+        data -= grad
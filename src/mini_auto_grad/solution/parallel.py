@@ -0,0 +1,134 @@
+import multiprocessing
+from multiprocessing.connection import Connection
+from typing import Callable, Optional
+
+import numpy as np
+
+from mini_auto_grad.solution.engine import Tensor
+from mini_auto_grad.solution.nn import MLP
+from mini_auto_grad.solution.optim import Optimizer
+
+Loss = Callable[[Tensor, np.ndarray], Tensor]
+
+
+def squared_error(y_pred: Tensor, y: np.ndarray) -> Tensor:
+    """The summed squared error of a batch, the default loss of `DataParallelTrainer`."""
+    return ((y_pred - y) ** 2).sum()
+
+
+class DataParallelTrainer:
+    """Trains an `MLP` on a dataset that is sharded over a pool of worker processes.
+
+    Every worker holds a replica of the MLP and its shard of the data. On each step
+    the current parameters are shared with the workers, every worker runs a batched
+    forward and backward pass over its shard and writes its gradient to its row of a
+    shared memory buffer. The rows are then summed (all-reduce), divided by the size
+    of the dataset and applied by the optimizer.
+
+    The MLP needs flat parameters, see `Module.flatten_parameters`, and the optimizer
+    should be created from them. `loss` must be picklable and sum over the samples.
+    """
+
+    def __init__(
+        self,
+        mlp: MLP,
+        optimizer: Optimizer,
+        x: np.ndarray,
+        y: np.ndarray,
+        n_workers: int,
+        loss: Loss = squared_error,
+    ) -> None:
+        assert mlp.flat is not None, "Call mlp.flatten_parameters() first"
+        y = y.reshape(len(y), -1)
+        assert len(x) == len(y), "Expected one target per sample"
+
+        self.mlp = mlp
+        self.optimizer = optimizer
+        self.n_samples = len(x)
+
+        n_parameters = len(mlp.flat)
+        self._parameters = multiprocessing.RawArray("d", n_parameters)
+        self._gradients = multiprocessing.RawArray("d", n_workers * n_parameters)
+        self.parameters = np.frombuffer(self._parameters)
+        self.gradients = np.frombuffer(self._gradients).reshape(n_workers, -1)
+
+        self._connections = []
+        self._workers = []
+        shards = zip(np.array_split(x, n_workers), np.array_split(y, n_workers))
+        for worker_index, (x_shard, y_shard) in enumerate(shards):
+            connection, worker_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_worker,
+                args=(
+                    mlp.sizes,
+                    mlp.activation,
+                    mlp.output_activation,
+                    x_shard,
+                    y_shard,
+                    loss,
+                    self._parameters,
+                    self._gradients,
+                    worker_index,
+                    worker_connection,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            self._connections.append(connection)
+            self._workers.append(worker)
+
+    def step(self) -> float:
+        """Runs one synchronous gradient step over the whole dataset and returns the loss."""
+        self.parameters[:] = self.mlp.flat.data
+        for connection in self._connections:
+            connection.send(True)
+        loss = sum(connection.recv() for connection in self._connections)
+
+        # All-reduce: the gradient of the mean loss over all shards.
+        np.sum(self.gradients, axis=0, out=self.mlp.flat.grad)
+        self.mlp.flat.grad /= self.n_samples
+        self.optimizer.step()
+
+        return loss / self.n_samples
+
+    def close(self) -> None:
+        for connection in self._connections:
+            connection.send(False)
+        for worker in self._workers:
+            worker.join()
+        self._connections = []
+        self._workers = []
+
+    def __enter__(self) -> "DataParallelTrainer":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+def _worker(
+    sizes: list[int],
+    activation: str,
+    output_activation: str,
+    x: np.ndarray,
+    y: np.ndarray,
+    loss: Loss,
+    shared_parameters,
+    shared_gradients,
+    worker_index: int,
+    connection: Connection,
+) -> None:
+    mlp = MLP(sizes, activation, output_activation)
+    flat = mlp.flatten_parameters()
+    parameters = np.frombuffer(shared_parameters)
+    gradients = np.frombuffer(shared_gradients).reshape(-1, len(flat))[worker_index]
+
+    while connection.recv():
+        flat.data[:] = parameters
+        mlp.zero_grad()
+        value: Optional[Tensor] = None
+        if len(x) > 0:
+            value = loss(mlp(x), y)
+            value.backward()
+        gradients[:] = flat.grad
+        connection.send(0.0 if value is None else float(value.data))
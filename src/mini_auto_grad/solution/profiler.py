@@ -0,0 +1,270 @@
+import contextlib
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Iterator, Union
+
+from mini_auto_grad.solution import engine
+from mini_auto_grad.solution.engine import BACKWARD_RULES, Value
+from mini_auto_grad.solution.graph import node_depths
+from mini_auto_grad.solution.nn import Layer
+
+# The Value methods and engine functions that create op nodes. The time spent in them
+# is the forward time of the op of the node they return.
+FORWARD_METHODS = [
+    "__add__",
+    "__mul__",
+    "__neg__",
+    "__sub__",
+    "__truediv__",
+    "__rtruediv__",
+    "__pow__",
+    "tanh",
+    "exp",
+    "log",
+    "relu",
+    "sigmoid",
+    "__abs__",
+]
+FORWARD_FUNCTIONS = ["_affine", "log_softmax", "cross_entropy"]
+
+_active = False
+
+
+class LayerProfile:
+    """The nodes a `Layer` created and the time spent in it."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.nodes = 0
+        self.forward_time = 0.0
+        self.backward_time = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "nodes": self.nodes,
+            "forward_time": self.forward_time,
+            "backward_time": self.backward_time,
+        }
+
+
+class Profile:
+    """What happened to Value graphs within a `profile()` block.
+
+    Times are in seconds. Depth and width are those of the largest graph that was
+    ordered for a backward pass: the longest path from its roots and the largest
+    number of nodes at the same depth.
+    """
+
+    def __init__(self) -> None:
+        self.node_counts: dict[str, int] = defaultdict(int)
+        self.forward_times: dict[str, float] = defaultdict(float)
+        self.backward_times: dict[str, float] = defaultdict(float)
+        self.topological_order_time = 0.0
+        self.max_depth = 0
+        self.max_width = 0
+        self.peak_live_nodes = 0
+        self.layers: list[LayerProfile] = []
+
+        self._live_nodes: dict[int, Union[LayerProfile, None]] = {}
+        self._layer_profiles: dict[int, LayerProfile] = {}
+        self._layer_stack: list[LayerProfile] = []
+
+    @property
+    def live_nodes(self) -> int:
+        """The nodes created within the block that have not been freed yet."""
+        return len(self._live_nodes)
+
+    def to_dict(self) -> dict:
+        ops = sorted(set(self.node_counts) | set(self.backward_times))
+        return {
+            "ops": {
+                op: {
+                    "nodes": self.node_counts.get(op, 0),
+                    "forward_time": self.forward_times.get(op, 0.0),
+                    "backward_time": self.backward_times.get(op, 0.0),
+                }
+                for op in ops
+            },
+            "topological_order_time": self.topological_order_time,
+            "max_depth": self.max_depth,
+            "max_width": self.max_width,
+            "peak_live_nodes": self.peak_live_nodes,
+            "layers": [layer.to_dict() for layer in self.layers],
+        }
+
+    def to_json(self, path: Union[str, os.PathLike]) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def report(self) -> str:
+        """The profile as plain text tables."""
+        summary = self.to_dict()
+        lines = [_row("op", "nodes", "forward ms", "backward ms")]
+        for op, stats in summary["ops"].items():
+            lines.append(
+                _row(
+                    op,
+                    stats["nodes"],
+                    f"{stats['forward_time'] * 1e3:.3f}",
+                    f"{stats['backward_time'] * 1e3:.3f}",
+                )
+            )
+        lines.append("")
+        lines.append(
+            f"topological order: {self.topological_order_time * 1e3:.3f} ms, "
+            f"depth: {self.max_depth}, width: {self.max_width}, "
+            f"peak live nodes: {self.peak_live_nodes}"
+        )
+        if self.layers:
+            lines.append("")
+            lines.append(_row("layer", "nodes", "forward ms", "backward ms"))
+            for layer in self.layers:
+                lines.append(
+                    _row(
+                        layer.name,
+                        layer.nodes,
+                        f"{layer.forward_time * 1e3:.3f}",
+                        f"{layer.backward_time * 1e3:.3f}",
+                    )
+                )
+        return "\n".join(lines)
+
+    def _layer_profile(self, layer: Layer) -> LayerProfile:
+        if id(layer) not in self._layer_profiles:
+            profile = LayerProfile(f"{len(self.layers)}: {layer!r}")
+            self._layer_profiles[id(layer)] = profile
+            self.layers.append(profile)
+        return self._layer_profiles[id(layer)]
+
+    def _record_graph(self, order: list[Value]) -> None:
+        depths = node_depths(order)
+        if depths:
+            self.max_depth = max(self.max_depth, max(depths.values()))
+            self.max_width = max(self.max_width, *Counter(depths.values()).values())
+
+
+@contextlib.contextmanager
+def profile() -> Iterator[Profile]:
+    """Profiles every Value graph that is built or differentiated within the block.
+
+    The engine is instrumented by wrapping the methods and functions that create
+    nodes, `Value.__init__`, the rules in `BACKWARD_RULES`,
+    `find_reversed_topological_order` and `Layer.__call__` on entry, and restoring
+    them on exit. Outside of the block nothing is wrapped, so there is no overhead.
+    Functions imported by name before entering, like `from engine import log_softmax`,
+    still count their nodes but not their forward time.
+    """
+    global _active
+    assert not _active, "Profiles cannot be nested"
+
+    result = Profile()
+    patches = _patches(result)
+    originals = [(owner, name, owner.__dict__.get(name)) for owner, name, _ in patches]
+    backward_rules = dict(BACKWARD_RULES)
+
+    _active = True
+    for owner, name, wrapper in patches:
+        _set(owner, name, wrapper)
+    BACKWARD_RULES.update(
+        {op: _timed_backward(result, op, rule) for op, rule in backward_rules.items()}
+    )
+    try:
+        yield result
+    finally:
+        BACKWARD_RULES.update(backward_rules)
+        for owner, name, original in originals:
+            _set(owner, name, original)
+        _active = False
+
+
+def _patches(result: Profile) -> list[tuple[object, str, object]]:
+    initialize = Value.__init__
+    call_layer = Layer.__call__
+    order_graph = engine.find_reversed_topological_order
+    live_nodes = result._live_nodes
+    layer_stack = result._layer_stack
+
+    def __init__(node, *args, **kwargs):
+        initialize(node, *args, **kwargs)
+        result.node_counts[node.op] += 1
+        layer = layer_stack[-1] if layer_stack else None
+        if layer is not None:
+            layer.nodes += 1
+        live_nodes[id(node)] = layer
+        if len(live_nodes) > result.peak_live_nodes:
+            result.peak_live_nodes = len(live_nodes)
+
+    def __del__(node):
+        live_nodes.pop(id(node), None)
+
+    def __call__(layer, x):
+        layer_profile = result._layer_profile(layer)
+        layer_stack.append(layer_profile)
+        start = time.perf_counter()
+        try:
+            return call_layer(layer, x)
+        finally:
+            layer_profile.forward_time += time.perf_counter() - start
+            layer_stack.pop()
+
+    def find_reversed_topological_order(*roots):
+        start = time.perf_counter()
+        order = order_graph(*roots)
+        result.topological_order_time += time.perf_counter() - start
+        result._record_graph(order)
+        return order
+
+    patches = [
+        (Value, "__init__", __init__),
+        (Value, "__del__", __del__),
+        (Layer, "__call__", __call__),
+        (engine, "find_reversed_topological_order", find_reversed_topological_order),
+    ]
+    for name in FORWARD_METHODS:
+        patches.append(
+            (Value, name, _timed_forward(result, name, getattr(Value, name)))
+        )
+    for name in FORWARD_FUNCTIONS:
+        function = getattr(engine, name)
+        patches.append((engine, name, _timed_forward(result, name, function)))
+    return patches
+
+
+def _timed_forward(result: Profile, name: str, function):
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        output = function(*args, **kwargs)
+        op = output.op if isinstance(output, Value) else name
+        result.forward_times[op] += time.perf_counter() - start
+        return output
+
+    return timed
+
+
+def _timed_backward(result: Profile, op: str, rule):
+    live_nodes = result._live_nodes
+
+    def timed(node, grad_parent):
+        start = time.perf_counter()
+        rule(node, grad_parent)
+        elapsed = time.perf_counter() - start
+        result.backward_times[op] += elapsed
+        layer = live_nodes.get(id(node))
+        if layer is not None:
+            layer.backward_time += elapsed
+
+    return timed
+
+
+def _set(owner: object, name: str, value: object) -> None:
+    if value is not None:
+        setattr(owner, name, value)
+    elif name in vars(owner):
+        delattr(owner, name)
+
+
+def _row(*cells: object) -> str:
+    return f"{str(cells[0]):<40}" + "".join(f"{str(c):>14}" for c in cells[1:])
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Callable, Optional, Union
+
+from mini_auto_grad.solution.engine import (
+    BACKWARD_RULES,
+    FORWARD_RULES,
+    Value,
+    find_reversed_topological_order,
+)
+
+Outputs = Union[Value, list[Value]]
+
+
+class Tape:
+    """A recorded graph that can be replayed on new inputs without building new nodes.
+
+    The graph is linearized once into a forward order (children before parents) and a
+    backward order (parents before children). Replaying overwrites the `data` of the
+    recorded nodes in place using `FORWARD_RULES` and propagates gradients with
+    `BACKWARD_RULES`. Leaves that are not inputs, such as the parameters of an `MLP`,
+    are read on every replay, so updating their `data` between steps is reflected.
+
+    The tape is only valid for functions whose graph does not depend on the values
+    of the inputs, e.g. no `if` on `Value.data`.
+    """
+
+    def __init__(self, inputs: list[Value], outputs: Outputs) -> None:
+        self.inputs = inputs
+        self._single_output = isinstance(outputs, Value)
+        self.outputs = [outputs] if self._single_output else list(outputs)
+
+        self.backward_order = find_reversed_topological_order(*self.outputs)
+        self.forward_order = [n for n in reversed(self.backward_order) if n.children]
+
+    def __call__(self, x: list[float]) -> Union[float, list[float]]:
+        """Replays the forward pass with new input values."""
+        assert len(x) == len(self.inputs), "Expected one value per traced input"
+        for value, x_i in zip(self.inputs, x):
+            value.data = x_i
+
+        forward_rules = FORWARD_RULES
+        for node in self.forward_order:
+            forward_rules[node.op](node)
+
+        if self._single_output:
+            return self.outputs[0].data
+        return [output.data for output in self.outputs]
+
+    def backward(self, grad_outputs: Optional[list[float]] = None) -> list[float]:
+        """Propagates gradients of the last replay and returns those of the inputs.
+
+        Gradients of the other leaves (the parameters) accumulate like `Value.backward`.
+        """
+        for node in self.forward_order:
+            node.grad = 0.0
+        for value in self.inputs:
+            value.grad = 0.0
+
+        if grad_outputs is None:
+            grad_outputs = [1.0] * len(self.outputs)
+        for output, grad in zip(self.outputs, grad_outputs):
+            output.grad += grad
+
+        backward_rules = BACKWARD_RULES
+        for node in self.backward_order:
+            backward_rules[node.op](node, node.grad)
+
+        return [value.grad for value in self.inputs]
+
+    def __len__(self) -> int:
+        return len(self.backward_order)
+
+    def __repr__(self) -> str:
+        return f"Tape(n_inputs={len(self.inputs)}, n_nodes={len(self)})"
+
+
+def trace(
+    function: Callable[[list[Value]], Outputs], example_inputs: list[float]
+) -> Tape:
+    """Records the graph that `function` builds for `example_inputs` into a `Tape`."""
+    inputs = [Value(x) for x in example_inputs]
+    return Tape(inputs, function(inputs))
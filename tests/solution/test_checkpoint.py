@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from mini_auto_grad.solution.checkpoint import load_checkpoint, save_checkpoint
+from mini_auto_grad.solution.nn import MLP
+
+
+@pytest.mark.parametrize("flat", [False, True])
+@pytest.mark.solution()
+def test_loaded_checkpoint_matches_the_saved_mlp(tmp_path, flat: bool) -> None:
+    mlp = MLP([3, 4, 2], "relu", output_activation="identity")
+    if flat:
+        mlp.flatten_parameters()
+    x = np.random.default_rng(0).uniform(-1, 1, size=(5, 3))
+    path = tmp_path / "mlp.ckpt"
+
+    save_checkpoint(mlp, path)
+    loaded = load_checkpoint(path, sizes=[3, 4, 2])
+
+    assert isinstance(loaded.flat.data, np.memmap)
+    assert (loaded.activation, loaded.output_activation) == ("relu", "identity")
+    assert [p.data for p in loaded.parameters()] == [p.data for p in mlp.parameters()]
+    np.testing.assert_allclose(loaded.predict(x), mlp(x).data)
+
+
+@pytest.mark.solution()
+def test_updates_of_a_loaded_checkpoint_do_not_change_the_file(tmp_path) -> None:
+    path = tmp_path / "mlp.ckpt"
+    save_checkpoint(MLP([2, 3, 1]), path)
+    loaded = load_checkpoint(path)
+
+    loaded.flat.data += 1.0
+
+    np.testing.assert_array_equal(load_checkpoint(path).flat.data, loaded.flat.data - 1)
+
+
+@pytest.mark.solution()
+def test_load_checkpoint_checks_the_shapes(tmp_path) -> None:
+    path = tmp_path / "mlp.ckpt"
+    save_checkpoint(MLP([2, 3, 1]), path)
+
+    with pytest.raises(ValueError, match="sizes"):
+        load_checkpoint(path, sizes=[2, 4, 1])
+
+    with open(path, "r+b") as f:
+        f.truncate(path.stat().st_size - 8)
+    with pytest.raises(ValueError, match="Expected 13 parameters"):
+        load_checkpoint(path)
+
+
+@pytest.mark.solution()
+def test_read_only_checkpoint_can_serve_predictions(tmp_path) -> None:
+    mlp = MLP([3, 4, 2])
+    x = np.random.default_rng(0).uniform(-1, 1, size=(5, 3))
+    path = tmp_path / "mlp.ckpt"
+    save_checkpoint(mlp, path)
+
+    loaded = load_checkpoint(path, mmap_mode="r")
+
+    assert not loaded.flat.data.flags.writeable
+    np.testing.assert_allclose(loaded.predict(x), mlp(x).data)
+    assert loaded.predict(x[0].tolist()) == pytest.approx(mlp.predict(x[0].tolist()))
+    assert [o.data for o in loaded(x[0].tolist())] == pytest.approx(
+        [o.data for o in mlp(x[0].tolist())]
+    )
@@ -0,0 +1,51 @@
+import math
+
+import numpy as np
+import pytest
+
+from mini_auto_grad.solution.dual import Dual, push_forward
+from mini_auto_grad.solution.engine import Value
+
+
+def _function(a, b):
+    c = a * b + 2
+    d = (c / b - a**2).tanh()
+    return d - 1 / (3 - a) + (-b) * 0.5
+
+
+@pytest.mark.parametrize("raw_a,raw_b", [(0.5, 1.5), (-1.0, 3.0), (2.0, -0.25)])
+@pytest.mark.solution()
+def test_dual_derivatives_match_backward(raw_a: float, raw_b: float) -> None:
+    a, b = Value(raw_a), Value(raw_b)
+    expected = _function(a, b)
+    expected.backward()
+
+    along_a = _function(Dual(raw_a, 1.0), Dual(raw_b, 0.0))
+    along_b = _function(Dual(raw_a, 0.0), Dual(raw_b, 1.0))
+
+    assert along_a.data == pytest.approx(expected.data)
+    assert along_a.tangent == pytest.approx(a.grad)
+    assert along_b.tangent == pytest.approx(b.grad)
+
+
+@pytest.mark.solution()
+def test_vector_tangents_push_several_directions_at_once() -> None:
+    output = Dual(0.3, np.array([1.0, 0.0])) * Dual(2.0, np.array([0.0, 1.0]))
+    output = output.tanh()
+
+    local_gradient = 1 - math.tanh(0.6) ** 2
+    np.testing.assert_allclose(
+        output.tangent, [2.0 * local_gradient, 0.3 * local_gradient]
+    )
+
+
+@pytest.mark.solution()
+def test_push_forward_through_recorded_graph() -> None:
+    a, b = Value(0.5), Value(1.5)
+    output = _function(a, b)
+
+    (dual,) = push_forward([output], [a, b], [1.0, 0.0])
+
+    output.backward()
+    assert dual.data == output.data
+    assert dual.tangent == pytest.approx(a.grad)
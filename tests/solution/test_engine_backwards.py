@@ -1,8 +1,17 @@
 import math
+import sys
 
 import pytest
 
-from mini_auto_grad.solution.engine import Value
+from mini_auto_grad.solution.engine import (
+    Value,
+    affine_tanh,
+    backward,
+    find_reversed_topological_order,
+    grad,
+    linear_combination,
+    no_grad,
+)
 
 
 @pytest.mark.parametrize("data", [-1.0, 0, 1.0, 10], ids=lambda d: f"data={d}")
@@ -118,3 +127,212 @@ def test_tanh_backwards(raw_value: float):
     output.backward()
 
     assert value.grad == 1 - math.tanh(raw_value) ** 2
+
+
+@pytest.mark.solution()
+def test_backwards_through_chain_deeper_than_recursion_limit():
+    value = Value(1)
+
+    output = value
+    for _ in range(10 * sys.getrecursionlimit()):
+        output = output + value
+
+    output.backward()
+    assert value.grad == 10 * sys.getrecursionlimit() + 1
+
+
+@pytest.mark.solution()
+def test_topological_order_places_parents_before_children():
+    a = Value(2)
+    b = Value(3)
+    c = a * b
+    d = c + a
+    e = d.tanh() * c
+
+    order = find_reversed_topological_order(e)
+
+    assert order[0] is e
+    assert len(order) == len(set(order))
+    position = {node: i for i, node in enumerate(order)}
+    for node in order:
+        for child in node.children:
+            assert position[node] < position[child]
+
+
+@pytest.mark.parametrize("cache_order", [False, True])
+@pytest.mark.solution()
+def test_repeated_backward_accumulates_only_in_leaves(cache_order: bool):
+    a = Value(2)
+    b = Value(3)
+    c = a * b
+    d = c * c
+
+    d.backward(cache_order=cache_order)
+    d.backward(cache_order=cache_order)
+
+    assert c.grad == 2 * c.data
+    assert a.grad == 2 * (2 * c.data * b.data)
+    assert b.grad == 2 * (2 * c.data * a.data)
+
+
+@pytest.mark.solution()
+def test_cached_order_is_reused_until_invalidated():
+    a = Value(2)
+    b = a.tanh() * a
+
+    b.backward(cache_order=True)
+    order = b._order
+    b.backward(cache_order=True)
+    assert b._order is order
+
+    b.invalidate_order()
+    assert b._order is None
+
+
+@pytest.mark.solution()
+def test_backward_of_several_roots_sums_their_gradients():
+    a = Value(2)
+    b = Value(-3)
+    shared = a * b
+    first = shared.tanh()
+    second = shared * a
+
+    backward([first, second])
+
+    expected_a = Value(2)
+    expected_b = Value(-3)
+    expected_shared = expected_a * expected_b
+    (expected_shared.tanh() + expected_shared * expected_a).backward()
+    assert a.grad == pytest.approx(expected_a.grad)
+    assert b.grad == pytest.approx(expected_b.grad)
+    assert first.grad == 1
+    assert second.grad == 1
+
+
+@pytest.mark.solution()
+def test_backward_without_retaining_graph_releases_children():
+    a = Value(2)
+    b = Value(-3)
+    c = a * b
+    d = c.tanh() + c
+
+    d.backward(retain_graph=False)
+
+    assert a.grad == pytest.approx((1 - math.tanh(-6) ** 2 + 1) * -3)
+    assert b.grad == pytest.approx((1 - math.tanh(-6) ** 2 + 1) * 2)
+    for node in [a, b, c, d]:
+        assert node.children == ()
+        assert node.op == "leaf"
+
+
+@pytest.mark.solution()
+def test_no_grad_does_not_record_the_graph():
+    a = Value(2)
+
+    with no_grad():
+        b = (a * 3 + 1).tanh() / a - a**2
+    c = a * 3
+
+    assert b.data == pytest.approx(math.tanh(7) / 2 - 4)
+    assert b.children == ()
+    assert c.children != ()
+
+
+@pytest.mark.parametrize("fused", [linear_combination, affine_tanh])
+@pytest.mark.solution()
+def test_fused_affine_matches_unfused_graph(fused):
+    raw_weights = [0.5, -1.5, 2.0]
+    raw_inputs = [1.0, 0.25, -0.75]
+
+    weights = [Value(w) for w in raw_weights]
+    inputs = [Value(x) for x in raw_inputs]
+    bias = Value(0.1)
+    output = fused(weights, inputs, bias)
+    output.backward()
+
+    expected_weights = [Value(w) for w in raw_weights]
+    expected_inputs = [Value(x) for x in raw_inputs]
+    expected_bias = Value(0.1)
+    expected = (
+        sum(w * x for w, x in zip(expected_weights, expected_inputs)) + expected_bias
+    )
+    if fused is affine_tanh:
+        expected = expected.tanh()
+    expected.backward()
+
+    assert len(find_reversed_topological_order(output)) == 2 * 3 + 2
+    assert output.data == expected.data
+    assert [w.grad for w in weights] == [w.grad for w in expected_weights]
+    assert [x.grad for x in inputs] == [x.grad for x in expected_inputs]
+    assert bias.grad == expected_bias.grad
+
+
+@pytest.mark.solution()
+def test_grad_leaves_the_grad_of_nodes_untouched():
+    a = Value(2)
+    b = Value(-3)
+    c = a * b + a.tanh()
+
+    gradients = grad(c, [a, b, Value(1)])
+
+    assert [g.data for g in gradients] == pytest.approx(
+        [-3 + 1 - math.tanh(2) ** 2, 2, 0]
+    )
+    assert a.grad == 0 and b.grad == 0 and c.grad == 0
+
+
+@pytest.mark.solution()
+def test_grad_with_create_graph_can_be_differentiated_again():
+    x = Value(0.7)
+    output = (x * x).tanh() + x**3 + 2 * x
+
+    (first,) = grad(output, [x], create_graph=True)
+    (second,) = grad(first, [x], create_graph=True)
+    (third,) = grad(second, [x])
+
+    t = math.tanh(0.49)
+    assert first.data == pytest.approx(2 * 0.7 * (1 - t**2) + 3 * 0.49 + 2)
+    assert second.data == pytest.approx(
+        2 * (1 - t**2) - 8 * 0.49 * t * (1 - t**2) + 6 * 0.7
+    )
+    assert third.data == pytest.approx(
+        -24 * 0.7 * t * (1 - t**2) - 16 * 0.343 * (1 - t**2) * (1 - 3 * t**2) + 6
+    )
+
+
+@pytest.mark.solution()
+def test_backward_of_several_roots_with_grad_outputs():
+    weights = [Value(0.5), Value(-1.5)]
+    inputs = [Value(2.0), Value(1.0)]
+    roots = [linear_combination(weights, inputs).tanh(), weights[0] * inputs[1]]
+
+    backward(roots, [2.0, -3.0])
+
+    expected_weights = [Value(0.5), Value(-1.5)]
+    expected_inputs = [Value(2.0), Value(1.0)]
+    expected_roots = [
+        linear_combination(expected_weights, expected_inputs).tanh(),
+        expected_weights[0] * expected_inputs[1],
+    ]
+    (2.0 * expected_roots[0] + -3.0 * expected_roots[1]).backward()
+    for value, expected in zip(weights + inputs, expected_weights + expected_inputs):
+        assert value.grad == pytest.approx(expected.grad)
+    assert [root.grad for root in roots] == [2.0, -3.0]
+
+
+@pytest.mark.solution()
+def test_grad_with_create_graph_sums_contributions_in_one_node():
+    x = Value(0.5)
+    weights = [Value(0.1 * i) for i in range(4)]
+    output = sum(affine_tanh(weights, [x] * 4, Value(0.2)) for _ in range(3))
+
+    gradients = grad(output, [x, *weights], create_graph=True)
+
+    assert all(g.op == "linear" for g in gradients)
+    order = find_reversed_topological_order(*gradients)
+    # One mul for the derivative of each tanh, no mul or add per contribution.
+    assert [v.op for v in order].count("mul") == 3
+    assert "add" not in [v.op for v in order]
+    assert [g.data for g in gradients] == pytest.approx(
+        [g.data for g in grad(output, [x, *weights])]
+    )
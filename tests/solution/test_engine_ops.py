@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+import pytest
+
+from mini_auto_grad.solution.engine import (
+    Value,
+    cross_entropy,
+    grad,
+    log_softmax,
+    softmax,
+)
+from mini_auto_grad.solution.functional import jacobian
+from mini_auto_grad.solution.gradcheck import check_gradients
+from mini_auto_grad.solution.tape import trace
+
+
+def _unary_ops(x):
+    a, b = x
+    return a.exp() + (b**2 + 1).log() + (a * b).relu() + b.sigmoid() + abs(a - b)
+
+
+def _arithmetic_ops(x):
+    a, b = x
+    return -a + (a - b) / (b * b) - 2 / a + (1 - b) * (a / 3 - 0.5)
+
+
+def _softmax_ops(x):
+    return cross_entropy(x, 1) + log_softmax(x)[2] * softmax(x)[0]
+
+
+@pytest.mark.parametrize("function", [_unary_ops, _arithmetic_ops, _softmax_ops])
+@pytest.mark.solution()
+def test_op_gradients_match_finite_differences(function) -> None:
+    x = [0.7, -1.3, 2.1] if function is _softmax_ops else [0.7, -1.3]
+
+    assert check_gradients(function, x, n_workers=1).passed()
+
+
+@pytest.mark.parametrize("function", [_unary_ops, _arithmetic_ops, _softmax_ops])
+@pytest.mark.solution()
+def test_op_second_derivatives_match_finite_differences_of_the_gradient(
+    function,
+) -> None:
+    x = [0.7, -1.3, 2.1] if function is _softmax_ops else [0.7, -1.3]
+    inputs = [Value(x_i) for x_i in x]
+    gradients = grad(function(inputs), inputs, create_graph=True)
+    second_derivatives = grad(gradients[0], inputs)
+
+    def first_derivative(x):
+        inputs = [Value(x_i) for x_i in x]
+        return grad(function(inputs), inputs)[0].data
+
+    for i, second_derivative in enumerate(second_derivatives):
+        upper = [x_j + 1e-6 * (i == j) for j, x_j in enumerate(x)]
+        lower = [x_j - 1e-6 * (i == j) for j, x_j in enumerate(x)]
+        finite_difference = (first_derivative(upper) - first_derivative(lower)) / 2e-6
+        assert second_derivative.data == pytest.approx(finite_difference, abs=1e-6)
+
+
+@pytest.mark.solution()
+def test_softmax_ops_are_stable_for_large_logits() -> None:
+    logits = [Value(1000.0), Value(0.0), Value(-1000.0)]
+
+    loss = cross_entropy(logits, 1)
+    loss.backward()
+
+    assert loss.data == pytest.approx(1000.0)
+    assert [p.data for p in log_softmax(logits)] == pytest.approx([0, -1000, -2000])
+    assert [x.grad for x in logits] == pytest.approx([1.0, -1.0, 0.0])
+    assert Value(-1000.0).sigmoid().data == 0.0
+    assert Value(1000.0).sigmoid().data == 1.0
+
+
+@pytest.mark.solution()
+def test_cross_entropy_is_a_single_node() -> None:
+    logits = [Value(x) for x in [0.5, -1.0, 2.0]]
+
+    loss = cross_entropy(logits, 2)
+
+    assert loss.children == tuple(logits)
+    assert loss.data == pytest.approx(-math.log(softmax(logits)[2].data))
+
+
+@pytest.mark.solution()
+def test_tape_replays_the_new_ops() -> None:
+    tape = trace(_softmax_ops, [0.7, -1.3, 2.1])
+
+    output = tape([0.1, 0.2, -0.3])
+    inputs = [Value(x) for x in [0.1, 0.2, -0.3]]
+
+    assert output == pytest.approx(_softmax_ops(inputs).data)
+
+
+@pytest.mark.solution()
+def test_forward_and_reverse_jacobians_of_the_new_ops_agree() -> None:
+    def function(x):
+        return log_softmax([x_i.sigmoid() + x_i.relu() for x_i in x]) + [
+            cross_entropy([x_i.exp() + abs(x_i).log() for x_i in x], 0)
+        ]
+
+    x = [0.5, -1.5, 2.0]
+
+    np.testing.assert_allclose(
+        jacobian(function, x, mode="forward"), jacobian(function, x, mode="reverse")
+    )
+
+
+@pytest.mark.solution()
+def test_subtraction_negation_and_division_are_single_nodes() -> None:
+    a, b = Value(3.0), Value(-2.0)
+
+    assert (a - b).op == "sub" and (a - b).children == (a, b)
+    assert (-a).op == "neg" and (-a).children == (a,)
+    assert (a / b).op == "div" and (a / b).children == (a, b)
+    assert (6 / a).op == "rdiv" and (6 / a).children == (a,)
+    assert (6 / a).data == 2.0
+    assert [c.data for c in (1 - a).children] == [1, 3.0]
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from mini_auto_grad.solution.engine import Tensor, Value, no_grad
+
+
+@pytest.mark.solution()
+def test_elementwise_operations_match_value() -> None:
+    raw_a = [0.5, -1.0, 2.0]
+    raw_b = [1.5, 3.0, -0.25]
+
+    a, b = Tensor(raw_a), Tensor(raw_b)
+    output = ((a * b + 2) / b - a**2).tanh() - 1 / (3 - a)
+    output.sum().backward()
+
+    for i in range(3):
+        a_i, b_i = Value(raw_a[i]), Value(raw_b[i])
+        output_i = ((a_i * b_i + 2) / b_i - a_i**2).tanh() - 1 / (3 - a_i)
+        output_i.backward()
+
+        assert output.data[i] == pytest.approx(output_i.data)
+        assert a.grad[i] == pytest.approx(a_i.grad)
+        assert b.grad[i] == pytest.approx(b_i.grad)
+
+
+@pytest.mark.solution()
+def test_broadcasting_sums_gradient_back_to_operand_shape() -> None:
+    x = Tensor(np.ones((4, 3)))
+    row = Tensor(np.array([1.0, 2.0, 3.0]))
+    column = Tensor(np.ones((4, 1)))
+
+    output = x * row + column
+    output.sum().backward()
+
+    assert row.grad.shape == (3,)
+    np.testing.assert_allclose(row.grad, [4.0, 4.0, 4.0])
+    assert column.grad.shape == (4, 1)
+    np.testing.assert_allclose(column.grad, np.full((4, 1), 3.0))
+    np.testing.assert_allclose(x.grad, np.tile([1.0, 2.0, 3.0], (4, 1)))
+
+
+@pytest.mark.solution()
+def test_matmul_gradients() -> None:
+    rng = np.random.default_rng(0)
+    a = Tensor(rng.normal(size=(5, 3)))
+    b = Tensor(rng.normal(size=(3, 2)))
+
+    (a @ b).sum().backward()
+
+    np.testing.assert_allclose(a.grad, np.ones((5, 2)) @ b.data.T)
+    np.testing.assert_allclose(b.grad, a.data.T @ np.ones((5, 2)))
+
+
+@pytest.mark.parametrize("axis", [None, 0, 1])
+@pytest.mark.solution()
+def test_reductions(axis) -> None:
+    x = Tensor(np.arange(6.0).reshape(2, 3))
+
+    output = x.sum(axis=axis) * x.mean(axis=axis)
+    output.sum().backward()
+
+    expected_sum = x.data.sum(axis=axis)
+    expected_mean = x.data.mean(axis=axis)
+    n = x.data.size if axis is None else x.data.shape[axis]
+    np.testing.assert_allclose(output.data, expected_sum * expected_mean)
+    expected_grad = expected_mean + expected_sum / n
+    if axis is not None:
+        expected_grad = np.expand_dims(expected_grad, axis)
+    np.testing.assert_allclose(x.grad, np.broadcast_to(expected_grad, (2, 3)))
+
+
+@pytest.mark.solution()
+def test_no_grad_does_not_record_the_graph() -> None:
+    x = Tensor(np.ones((2, 2)))
+
+    with no_grad():
+        output = (x @ x + 1).tanh().sum()
+
+    assert output.children == ()
+
+
+@pytest.mark.solution()
+def test_repeated_backward_accumulates_only_in_leaves() -> None:
+    t = Tensor(2.0)
+    square = t * t
+    z = square * square
+
+    z.backward()
+    z.backward()
+
+    np.testing.assert_allclose(square.grad, 2 * square.data)
+    np.testing.assert_allclose(t.grad, 2 * 4 * t.data**3)
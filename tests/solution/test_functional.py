@@ -0,0 +1,102 @@
+import random
+
+import numpy as np
+import pytest
+
+from mini_auto_grad.solution.engine import Value, grad
+from mini_auto_grad.solution.functional import (
+    hessian_vector_product,
+    jacobian,
+    jvp,
+    vjp,
+)
+from mini_auto_grad.solution.nn import MLP, Layer
+
+
+def _loss(mlp: MLP) -> Value:
+    x = [[0.5, -1.0], [1.0, 0.25]]
+    y = [1.0, -0.5]
+    return sum((mlp(x_i)[0] - y_i) ** 2 for x_i, y_i in zip(x, y))
+
+
+@pytest.mark.solution()
+def test_hessian_vector_product_matches_finite_differences_of_the_gradient():
+    random.seed(0)
+    mlp = MLP([2, 3, 1])
+    parameters = mlp.parameters()
+    vector = [random.uniform(-1, 1) for _ in parameters]
+
+    product = hessian_vector_product(_loss(mlp), parameters, vector)
+
+    eps = 1e-6
+    gradients = []
+    for sign in [1, -1]:
+        for p, v in zip(parameters, vector):
+            p.data += sign * eps * v
+        gradients.append([g.data for g in grad(_loss(mlp), parameters)])
+        for p, v in zip(parameters, vector):
+            p.data -= sign * eps * v
+    expected = [(plus - minus) / (2 * eps) for plus, minus in zip(*gradients)]
+
+    assert product == pytest.approx(expected, rel=1e-4, abs=1e-6)
+
+
+@pytest.mark.parametrize("mode", ["forward", "reverse"])
+@pytest.mark.solution()
+def test_jacobian_matches_finite_differences(mode: str):
+    random.seed(0)
+    layer = Layer(3, 4, non_linear=True)
+    x = [0.5, -1.0, 0.25]
+
+    result = jacobian(layer, x, mode=mode)
+
+    eps = 1e-6
+    expected = np.zeros((4, 3))
+    for j in range(3):
+        plus = x[:j] + [x[j] + eps] + x[j + 1 :]
+        minus = x[:j] + [x[j] - eps] + x[j + 1 :]
+        expected[:, j] = (np.array(layer.predict(plus)) - layer.predict(minus)) / (
+            2 * eps
+        )
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-8)
+
+
+@pytest.mark.solution()
+def test_jvp_is_jacobian_times_tangents():
+    random.seed(0)
+    mlp = MLP([3, 4, 2])
+    x = [0.5, -1.0, 0.25]
+    tangents = [1.0, 2.0, -0.5]
+
+    outputs, product = jvp(mlp, x, tangents)
+
+    assert outputs == pytest.approx(mlp.predict(x))
+    assert product == pytest.approx(jacobian(mlp, x) @ np.array(tangents))
+
+
+@pytest.mark.solution()
+def test_vjp_is_cotangents_times_jacobian():
+    random.seed(0)
+    layer = Layer(3, 4, non_linear=True)
+    x = [0.5, -1.0, 0.25]
+    cotangents = [1.0, 2.0, -0.5, 0.0]
+
+    outputs, product = vjp(layer, x, cotangents)
+
+    assert outputs == pytest.approx(layer.predict(x))
+    assert product == pytest.approx(np.array(cotangents) @ jacobian(layer, x))
+
+
+@pytest.mark.solution()
+def test_reverse_jacobian_of_flat_mlp_matches_forward_mode():
+    random.seed(0)
+    mlp = MLP([4, 5, 3])
+    mlp.flatten_parameters()
+    x = [0.5, -1.0, 0.25, 2.0]
+
+    forward = jacobian(mlp, x, mode="forward")
+    reverse = jacobian(mlp, x, mode="reverse")
+
+    assert reverse.shape == (3, 4)
+    np.testing.assert_allclose(reverse, forward)
+    assert all(p.grad == 0 for p in mlp.parameters())
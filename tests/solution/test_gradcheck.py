@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+
+from mini_auto_grad.solution.gradcheck import check_gradients, check_module_gradients
+from mini_auto_grad.solution.nn import MLP
+
+
+@pytest.mark.solution()
+def test_check_gradients_of_function() -> None:
+    def function(x):
+        a, b = x
+        z = 2 * a + 2 + a
+        q = z.tanh() + z * b
+        return (z * z).tanh() + q + q * b / a
+
+    result = check_gradients(function, [-4.0, 2.0], n_workers=2)
+
+    assert len(result.relative_errors) == 2
+    assert result.passed()
+
+
+@pytest.mark.solution()
+def test_check_gradients_detects_a_wrong_gradient() -> None:
+    def function(x):
+        # Detaching `w * w` drops its part of the gradient: 9 instead of 27.
+        (w,) = x
+        return (w * w).data * w
+
+    result = check_gradients(function, [3.0], n_workers=1)
+
+    assert result.analytic[0] == pytest.approx(9.0)
+    assert result.numerical[0] == pytest.approx(27.0)
+    assert not result.passed()
+
+
+@pytest.mark.solution()
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_check_module_gradients(n_workers) -> None:
+    random.seed(0)
+    mlp = MLP([3, 4, 4, 1])
+    x = np.random.default_rng(0).uniform(-1, 1, size=(5, 3))
+
+    result = check_module_gradients(
+        mlp, lambda m: (m(x) ** 2).mean(), n_workers=n_workers
+    )
+
+    assert len(result.relative_errors) == len(mlp.parameters())
+    assert result.max_relative_error < 1e-6
+
+
+@pytest.mark.solution()
+def test_check_module_gradients_keeps_the_accumulated_grads() -> None:
+    mlp = MLP([3, 4, 1])
+    mlp.flatten_parameters()
+    x = np.random.default_rng(0).uniform(-1, 1, size=(5, 3))
+    (mlp(x) ** 2).sum().backward()
+    accumulated = mlp.flat.grad.copy()
+
+    check_module_gradients(mlp, lambda m: m(x).sum(), n_workers=1)
+
+    np.testing.assert_array_equal(mlp.flat.grad, accumulated)
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from mini_auto_grad.solution.engine import Value
+from mini_auto_grad.solution.graph import GraphSummary, export_graph, graph_statistics
+from mini_auto_grad.solution.nn import MLP
+
+
+@pytest.mark.solution()
+def test_graph_statistics_of_a_sum_chain() -> None:
+    x = [Value(float(i)) for i in range(4)]
+
+    statistics = graph_statistics(sum(x))
+
+    # 0 + x_0 + x_1 + x_2 + x_3: 4 adds, the int 0 and the 4 inputs.
+    assert statistics["nodes"] == 9
+    assert statistics["edges"] == 8
+    assert statistics["depth"] == 4
+    assert statistics["ops"] == {"add": 4, "leaf": 5}
+    assert statistics["depth_histogram"] == {0: 1, 1: 2, 2: 2, 3: 2, 4: 2}
+    assert statistics["fan_out_histogram"] == {0: 1, 1: 8}
+
+
+@pytest.mark.solution()
+def test_collapsed_mlp_has_one_node_per_layer() -> None:
+    mlp = MLP([3, 8, 8, 2])
+    outputs = mlp([0.5, -0.25, 1.0])
+
+    summary = GraphSummary(outputs)
+
+    assert [(n.label, n.parameters) for n in summary.nodes if n.count > 1] == [
+        ("8 x affine_tanh(n=3)", 32),
+        ("8 x affine_tanh(n=8)", 72),
+        ("2 x affine_tanh(n=8)", 18),
+    ]
+    assert len(summary.nodes) == 3 + 3
+    assert sum(count for _, _, count in summary.edges) == 3 * 8 + 8 * 8 + 8 * 2
+    assert summary.statistics["nodes"] == len(mlp.parameters()) + 3 + 8 + 8 + 2
+
+
+@pytest.mark.solution()
+def test_export_graph_without_collapsing(tmp_path) -> None:
+    a, b = Value(2.0), Value(-3.0)
+    c = (a * b).tanh() + a
+
+    dot = export_graph(c, tmp_path / "graph.dot", collapse=False)
+    exported = export_graph(c, tmp_path / "graph.json", collapse=False)
+
+    assert len(dot.nodes) == dot.statistics["nodes"] == 5
+    assert (tmp_path / "graph.dot").read_text().count("->") == 5
+    data = json.loads((tmp_path / "graph.json").read_text())
+    assert len(data["edges"]) == len(exported.edges) == 5
+    assert data["statistics"]["depth"] == 3
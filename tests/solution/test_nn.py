@@ -1,7 +1,11 @@
+import random
+
+import numpy as np
 import pytest
 
-from mini_auto_grad.solution.engine import Value
-from mini_auto_grad.solution.nn import MLP
+from mini_auto_grad.solution.engine import Value, ValueView
+from mini_auto_grad.solution.gradcheck import check_module_gradients
+from mini_auto_grad.solution.nn import MLP, Layer, Module, Neuron
 
 
 @pytest.mark.solution()
@@ -33,3 +37,222 @@ def test_mlp_can_learn_xor_problem() -> None:
 def _forward(mlp: MLP, x: list[list[float]], y: list[float]) -> Value:
     y_pred = [mlp(x_i)[0] for x_i in x]
     return sum((y_i - y_pred_i) ** 2 for y_i, y_pred_i in zip(y, y_pred)) / len(y)
+
+
+@pytest.mark.parametrize("activation", ["tanh", "relu", "sigmoid", "identity"])
+@pytest.mark.parametrize("module_type", [Neuron, Layer, MLP])
+@pytest.mark.solution()
+def test_batch_matches_per_sample_forward_and_backward(module_type, activation) -> None:
+    x = np.random.default_rng(0).uniform(-1, 1, size=(5, 3))
+    module = _create_module(module_type, activation)
+
+    expected_outputs = []
+    for x_i in x.tolist():
+        output = module(x_i)
+        output = output if isinstance(output, list) else [output]
+        sum(output).backward()
+        expected_outputs.append([o.data for o in output])
+    expected_grads = [p.grad for p in module.parameters()]
+
+    module.zero_grad()
+    output = module(x)
+    output.sum().backward()
+
+    np.testing.assert_allclose(output.data.reshape(5, -1), expected_outputs)
+    np.testing.assert_allclose([p.grad for p in module.parameters()], expected_grads)
+
+
+@pytest.mark.parametrize("flat", [False, True])
+@pytest.mark.parametrize("module_type", [Neuron, Layer, MLP])
+@pytest.mark.solution()
+def test_repeated_batch_backward_accumulates_only_in_parameters(
+    module_type, flat
+) -> None:
+    x = np.random.default_rng(0).uniform(-1, 1, size=(5, 3))
+    module = _create_module(module_type, "tanh")
+    if flat:
+        module.flatten_parameters()
+    loss = (module(x) ** 2).sum()
+
+    loss.backward()
+    single_pass_grads = [p.grad for p in module.parameters()]
+    loss.backward()
+
+    np.testing.assert_allclose(
+        [p.grad for p in module.parameters()], np.multiply(2, single_pass_grads)
+    )
+
+
+def _create_module(module_type, activation: str):
+    if module_type is Neuron:
+        return Neuron(3, activation=activation)
+    if module_type is Layer:
+        return Layer(3, 2, non_linear=True, activation=activation)
+    return MLP([3, 4, 2], activation)
+
+
+@pytest.mark.parametrize("activation", ["tanh", "relu", "sigmoid"])
+@pytest.mark.solution()
+def test_activation_is_fused_into_one_node_per_neuron(activation) -> None:
+    mlp = MLP([3, 4, 2], activation)
+
+    outputs = mlp([0.5, -0.25, 1.0])
+
+    assert all(o.op == f"affine_{activation}" for o in outputs)
+    assert all(len(o.children) == 2 * 4 + 1 for o in outputs)
+    assert check_module_gradients(
+        mlp, lambda m: sum(m([0.5, -0.25, 1.0])), n_workers=1
+    ).passed()
+
+
+@pytest.mark.parametrize("activation", ["tanh", "relu", "sigmoid"])
+@pytest.mark.solution()
+def test_output_layer_can_be_linear(activation) -> None:
+    random.seed(0)
+    mlp = MLP([2, 4, 1], activation, output_activation="identity")
+    x = np.random.default_rng(0).uniform(-1, 1, size=(20, 2))
+
+    assert [layer.activation for layer in mlp.layers] == [activation, "identity"]
+    assert mlp([0.5, -0.25])[0].op == "linear"
+    # Regression outputs are not squashed into the range of the activation.
+    mlp.layers[-1].neurons[0].bias.data = -20.0
+    assert mlp(x).data.max() < 0
+    mlp.flatten_parameters()
+    assert np.all(mlp.predict(x) < 0)
+
+
+@pytest.mark.solution()
+def test_mlp_can_learn_xor_problem_in_batch_mode() -> None:
+    x = np.array([[0, 1], [1, 1], [0, 0], [1, 0]], dtype=float)
+    y = np.array([[1], [0], [1], [0]], dtype=float)
+
+    random.seed(0)
+    mlp = MLP([2, 4, 4, 1])
+
+    for _ in range(50):
+        loss = ((mlp(x) - y) ** 2).mean()
+
+        mlp.zero_grad()
+        loss.backward()
+
+        lr = 0.1
+        for p in mlp.parameters():
+            p.data += -lr * p.grad
+
+    loss = ((mlp(x) - y) ** 2).mean()
+    assert loss.data <= 0.05
+
+
+@pytest.mark.parametrize("activation", ["tanh", "relu", "sigmoid", "identity"])
+@pytest.mark.parametrize("module_type", [Neuron, Layer, MLP])
+@pytest.mark.solution()
+def test_predict_matches_graph_forward(module_type, activation) -> None:
+    x = np.random.default_rng(0).uniform(-1, 1, size=(5, 3))
+    module = _create_module(module_type, activation)
+    module.flatten_parameters()
+
+    expected = module(x).data
+
+    np.testing.assert_allclose(module.predict(x), expected)
+    for x_i, expected_i in zip(x, expected):
+        np.testing.assert_allclose(module.predict(x_i), expected_i)
+        np.testing.assert_allclose(module.predict(x_i.tolist()), expected_i)
+
+
+@pytest.mark.solution()
+def test_flat_parameters_back_the_parameter_values() -> None:
+    mlp = MLP([3, 4, 2])
+    x = [0.5, -0.25, 1.0]
+    expected = [o.data for o in mlp(x)]
+    parameters = [p.data for p in mlp.parameters()]
+
+    flat = mlp.flatten_parameters()
+
+    np.testing.assert_array_equal(flat.data, parameters)
+    assert [o.data for o in mlp(x)] == pytest.approx(expected)
+
+    sum(mlp(x)).backward()
+    np.testing.assert_array_equal(flat.grad, [p.grad for p in mlp.parameters()])
+    assert np.any(flat.grad != 0)
+
+    mlp.zero_grad()
+    assert all(p.grad == 0 for p in mlp.parameters())
+
+    flat.data *= 2
+    assert [p.data for p in mlp.parameters()] == pytest.approx(
+        [2 * p for p in parameters]
+    )
+    np.testing.assert_array_equal(mlp.layers[1].flat.data, flat.data[16:])
+
+
+@pytest.mark.solution()
+def test_predict_with_flat_parameters() -> None:
+    x = np.random.default_rng(0).uniform(-1, 1, size=(5, 3))
+    mlp = MLP([3, 4, 2])
+    expected = mlp(x).data
+
+    with pytest.raises(AssertionError, match="flatten_parameters"):
+        mlp.predict(x)
+    mlp.flatten_parameters()
+
+    np.testing.assert_allclose(mlp.predict(x), expected)
+    np.testing.assert_allclose(mlp(x).data, expected)
+
+
+@pytest.mark.solution()
+def test_value_view_does_not_write_to_its_storage() -> None:
+    data = np.array([1.5, -2.0])
+    grad = np.array([0.25, 0.0])
+    data.flags.writeable = False
+
+    view = ValueView(data, grad, 0)
+
+    assert (view.data, view.grad) == (1.5, 0.25)
+    assert view.children == () and view.op == "leaf"
+    (view * 2).backward()
+    assert grad.tolist() == [2.25, 0.0]
+
+
+@pytest.mark.parametrize("module_type", [Neuron, Layer, MLP])
+@pytest.mark.solution()
+def test_1d_array_is_evaluated_as_a_single_sample(module_type) -> None:
+    module = _create_module(module_type, "tanh")
+    x = np.array([0.1, 0.2, 0.3])
+
+    output = module(x)
+
+    output = output if isinstance(output, list) else [output]
+    expected = module.predict(x.tolist())
+    expected = expected if isinstance(expected, list) else [expected]
+    assert [o.data for o in output] == pytest.approx(expected)
+    module.flatten_parameters()
+    np.testing.assert_allclose(module.predict(x), expected)
+
+
+class _Scale(Module):
+    def __init__(self) -> None:
+        self.scale = Value(2.0)
+
+    def parameters(self) -> list[Value]:
+        return [self.scale]
+
+    def __call__(self, x):
+        return [self.scale * x_i for x_i in x]
+
+
+@pytest.mark.solution()
+def test_module_subclass_does_not_need_flat_parameters() -> None:
+    module = _Scale()
+
+    with pytest.raises(NotImplementedError, match="_Scale"):
+        module.flatten_parameters()
+
+
+@pytest.mark.solution()
+def test_module_predict_defaults_to_calling_without_a_graph() -> None:
+    module = _Scale()
+
+    outputs = module.predict([1.0, -0.5])
+
+    assert outputs == [2.0, -1.0]
+    assert all(isinstance(o, float) for o in outputs)
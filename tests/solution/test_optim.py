@@ -0,0 +1,105 @@
+import math
+import random
+
+import pytest
+
+from mini_auto_grad.solution.engine import Value
+from mini_auto_grad.solution.nn import MLP
+from mini_auto_grad.solution.optim import SGD, Adam, RMSProp
+
+
+def _quadratic(parameters: list[Value]) -> Value:
+    return sum((p - i) ** 2 for i, p in enumerate(parameters))
+
+
+def _run(optimizer, parameters: list[Value], n_steps: int) -> None:
+    for _ in range(n_steps):
+        optimizer.zero_grad()
+        _quadratic(parameters).backward()
+        optimizer.step()
+
+
+@pytest.mark.solution()
+def test_sgd_with_momentum_matches_reference() -> None:
+    parameters = [Value(1.0), Value(-2.0)]
+    _run(SGD(parameters, lr=0.1, momentum=0.9), parameters, n_steps=3)
+
+    for i, start in enumerate([1.0, -2.0]):
+        data, velocity = start, 0.0
+        for _ in range(3):
+            velocity = 0.9 * velocity + 2 * (data - i)
+            data -= 0.1 * velocity
+        assert parameters[i].data == pytest.approx(data)
+
+
+@pytest.mark.solution()
+def test_rmsprop_matches_reference() -> None:
+    parameters = [Value(1.0), Value(-2.0)]
+    _run(RMSProp(parameters, lr=0.01), parameters, n_steps=3)
+
+    for i, start in enumerate([1.0, -2.0]):
+        data, square_average = start, 0.0
+        for _ in range(3):
+            grad = 2 * (data - i)
+            square_average = 0.99 * square_average + 0.01 * grad**2
+            data -= 0.01 * grad / (math.sqrt(square_average) + 1e-8)
+        assert parameters[i].data == pytest.approx(data)
+
+
+@pytest.mark.solution()
+def test_adam_matches_reference() -> None:
+    parameters = [Value(1.0), Value(-2.0)]
+    _run(Adam(parameters, lr=0.1), parameters, n_steps=3)
+
+    for i, start in enumerate([1.0, -2.0]):
+        data, m, v = start, 0.0, 0.0
+        for t in range(1, 4):
+            grad = 2 * (data - i)
+            m = 0.9 * m + 0.1 * grad
+            v = 0.999 * v + 0.001 * grad**2
+            m_hat = m / (1 - 0.9**t)
+            v_hat = v / (1 - 0.999**t)
+            data -= 0.1 * m_hat / (math.sqrt(v_hat) + 1e-8)
+        assert parameters[i].data == pytest.approx(data)
+
+
+@pytest.mark.solution()
+def test_mlp_can_learn_xor_problem_with_adam() -> None:
+    x = [[0, 1], [1, 1], [0, 0], [1, 0]]
+    y = [1, 0, 1, 0]
+
+    random.seed(0)
+    mlp = MLP([2, 4, 4, 1])
+    optimizer = Adam(mlp.parameters(), lr=0.05)
+
+    for _ in range(100):
+        y_pred = [mlp(x_i)[0] for x_i in x]
+        loss = sum((y_i - y_pred_i) ** 2 for y_i, y_pred_i in zip(y, y_pred)) / len(y)
+
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+
+    assert loss.data <= 0.05
+
+
+@pytest.mark.parametrize("optimizer_type", [SGD, RMSProp, Adam])
+@pytest.mark.solution()
+def test_flat_parameters_match_list_of_parameters(optimizer_type) -> None:
+    random.seed(0)
+    mlp = MLP([2, 3, 1])
+    flat_mlp = MLP([2, 3, 1])
+    for p, flat_p in zip(mlp.parameters(), flat_mlp.parameters()):
+        flat_p.data = p.data
+    optimizer = optimizer_type(mlp.parameters(), lr=0.1)
+    flat_optimizer = optimizer_type(flat_mlp.flatten_parameters(), lr=0.1)
+
+    for x in [[0.5, -1.0], [1.0, 0.25]]:
+        for module, opt in [(mlp, optimizer), (flat_mlp, flat_optimizer)]:
+            opt.zero_grad()
+            module(x)[0].backward()
+            opt.step()
+
+    assert [p.data for p in flat_mlp.parameters()] == pytest.approx(
+        [p.data for p in mlp.parameters()]
+    )
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from mini_auto_grad.solution.engine import Value
+from mini_auto_grad.solution.nn import MLP
+from mini_auto_grad.solution.optimize import optimize
+from mini_auto_grad.solution.tape import trace
+
+
+def _function(x):
+    a, b = x
+    scale = Value(2.0) * 3 + 1
+    shared = (a * b).tanh()
+    # Written out the way the operators used to build -a, - b and / (b * b + 1).
+    return [
+        a * -1 + shared * scale + b * -1,
+        (a * b).tanh() * (b * b + 1) ** -1 + 0 * 1 + sum([a, b]),
+    ]
+
+
+@pytest.mark.solution()
+def test_optimized_tape_matches_the_original() -> None:
+    tape = trace(_function, [0.5, -1.5])
+
+    optimized, report = optimize(tape, [])
+
+    for x in [[0.5, -1.5], [2.0, 0.25], [-0.3, 0.7]]:
+        assert optimized(x) == pytest.approx(tape(x))
+        for output in range(2):
+            grad_outputs = [float(i == output) for i in range(2)]
+            expected = tape.backward(grad_outputs)
+            assert optimized.backward(grad_outputs) == pytest.approx(expected)
+
+    assert report.nodes_saved == len(tape) - len(optimized) > 0
+    assert report.rewrites == {
+        # Value(2.0) * 3 + 1.
+        "folded": 2,
+        # The second -1, 0 and 1.
+        "deduplicated_constants": 3,
+        # (a * b).tanh() is computed twice.
+        "merged": 2,
+        # a * -1 and b * -1, which both end up in a sub.
+        "neg": 2,
+        "sub": 2,
+        "div": 1,
+        # + 0 and the 0 + a of sum().
+        "identity": 2,
+    }
+    ops = {node.op for node in optimized.backward_order}
+    assert "pow" not in ops and "neg" not in ops
+
+
+@pytest.mark.solution()
+def test_optimize_keeps_the_parameters_and_their_gradients() -> None:
+    random.seed(0)
+    mlp = MLP([3, 4, 1])
+    tape = trace(lambda x: (mlp(x[:3])[0] + x[3] * -1) ** 2 / 2, [0.1, 0.2, 0.3, 0.4])
+    x = [0.5, -0.5, 1.0, 0.25]
+
+    mlp.zero_grad()
+    tape(x)
+    tape.backward()
+    expected = [p.grad for p in mlp.parameters()]
+
+    optimized, report = optimize(tape, mlp.parameters())
+    assert [p.grad for p in mlp.parameters()] == expected
+
+    mlp.zero_grad()
+    optimized(x)
+    optimized.backward()
+
+    assert [p.grad for p in mlp.parameters()] == pytest.approx(expected)
+    assert report.rewrites["sub"] == 1
+    assert report.nodes_after < report.nodes_before
@@ -0,0 +1,34 @@
+import random
+
+import numpy as np
+import pytest
+
+from mini_auto_grad.solution.nn import MLP
+from mini_auto_grad.solution.optim import SGD
+from mini_auto_grad.solution.parallel import DataParallelTrainer
+
+
+@pytest.mark.solution()
+def test_data_parallel_step_matches_single_process_step() -> None:
+    rng = np.random.default_rng(0)
+    x = rng.uniform(-1, 1, size=(9, 3))
+    y = rng.uniform(-1, 1, size=9)
+
+    random.seed(0)
+    mlp = MLP([3, 4, 1])
+    expected_mlp = MLP([3, 4, 1])
+    for p, expected_p in zip(mlp.parameters(), expected_mlp.parameters()):
+        expected_p.data = p.data
+
+    expected_optimizer = SGD(expected_mlp.flatten_parameters(), lr=0.1)
+    expected_mlp.zero_grad()
+    expected_loss = ((expected_mlp(x) - y.reshape(-1, 1)) ** 2).mean()
+    expected_loss.backward()
+    expected_optimizer.step()
+
+    optimizer = SGD(mlp.flatten_parameters(), lr=0.1)
+    with DataParallelTrainer(mlp, optimizer, x, y, n_workers=2) as trainer:
+        loss = trainer.step()
+
+    assert loss == pytest.approx(float(expected_loss.data))
+    np.testing.assert_allclose(mlp.flat.data, expected_mlp.flat.data)
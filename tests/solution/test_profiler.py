@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from mini_auto_grad.solution.engine import Value
+from mini_auto_grad.solution.nn import MLP, Layer
+from mini_auto_grad.solution.profiler import profile
+
+
+@pytest.mark.solution()
+def test_profile_counts_nodes_and_attributes_them_to_layers(tmp_path) -> None:
+    mlp = MLP([3, 4, 2])
+
+    with profile() as result:
+        loss = sum(mlp([0.5, -0.25, 1.0])) ** 2
+        loss.backward()
+
+    # 3 wrapped inputs + 4 affine nodes, 2 affine nodes, then 0 + a + b and pow.
+    assert result.node_counts == {"leaf": 4, "affine_tanh": 6, "add": 2, "pow": 1}
+    assert [layer.nodes for layer in result.layers] == [7, 2]
+    assert all(layer.forward_time > 0 for layer in result.layers)
+    assert all(layer.backward_time > 0 for layer in result.layers)
+    assert result.backward_times.keys() >= {"affine_tanh", "add", "pow"}
+    assert result.forward_times.keys() >= {"affine_tanh", "add", "pow"}
+    assert result.topological_order_time > 0
+    # pow -> add -> add -> affine -> affine -> the weights, biases and inputs of the
+    # first layer.
+    assert result.max_depth == 5
+    assert result.max_width == 12 + 4 + 3
+
+    path = tmp_path / "profile.json"
+    result.to_json(path)
+    assert json.loads(path.read_text())["ops"]["affine_tanh"]["nodes"] == 6
+    assert "affine_tanh" in result.report()
+
+
+@pytest.mark.solution()
+def test_profile_tracks_peak_live_nodes() -> None:
+    with profile() as result:
+        x = Value(1.0)
+        for _ in range(99):
+            x = x * 1.0
+        x.backward(retain_graph=False)
+        del x
+
+    assert result.peak_live_nodes >= 100
+    assert result.live_nodes == 0
+
+
+@pytest.mark.solution()
+def test_profile_removes_its_hooks_on_exit() -> None:
+    methods = dict(vars(Value))
+    call = Layer.__call__
+
+    with profile():
+        assert Value.__init__ is not methods["__init__"]
+
+    assert dict(vars(Value)) == methods
+    assert Layer.__call__ is call
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from mini_auto_grad.solution.engine import Value
+from mini_auto_grad.solution.nn import MLP
+from mini_auto_grad.solution.tape import trace
+
+
+def _loss(mlp: MLP, x: list) -> Value:
+    *features, target = x
+    return (mlp(features)[0] - target) ** 2 / 2
+
+
+@pytest.mark.solution()
+def test_replay_matches_eager_forward_and_backward() -> None:
+    mlp = MLP([3, 4, 1])
+    tape = trace(lambda x: _loss(mlp, x), [0.0, 0.0, 0.0, 0.0])
+
+    for _ in range(3):
+        x = [random.uniform(-1, 1) for _ in range(4)]
+
+        mlp.zero_grad()
+        expected_inputs = [Value(x_i) for x_i in x]
+        expected = _loss(mlp, expected_inputs)
+        expected.backward()
+        expected_grads = [p.grad for p in mlp.parameters()]
+
+        mlp.zero_grad()
+        output = tape(x)
+        input_grads = tape.backward()
+
+        assert output == pytest.approx(expected.data)
+        assert input_grads == pytest.approx([v.grad for v in expected_inputs])
+        assert [p.grad for p in mlp.parameters()] == pytest.approx(expected_grads)
+
+
+@pytest.mark.solution()
+def test_replay_reuses_the_recorded_nodes() -> None:
+    tape = trace(lambda x: [x[0] * x[1], (x[0] + 1).tanh()], [1.0, 2.0])
+    nodes = list(tape.backward_order)
+
+    assert tape([3.0, 4.0]) == pytest.approx([12.0, 0.9993292997])
+    assert tape.backward([1.0, 0.0]) == [4.0, 3.0]
+    assert tape.backward_order == nodes
+
+
+@pytest.mark.solution()
+def test_replay_sees_parameter_updates() -> None:
+    weight = Value(2.0)
+    tape = trace(lambda x: x[0] * weight, [1.0])
+
+    weight.data = 5.0
+
+    assert tape([3.0]) == 15.0